@@ -1,6 +1,7 @@
-from flask import Flask, redirect, url_for
+from flask import Flask, Response, redirect, url_for
 from config import Config
-from app.extensions import db, migrate, login, cache
+from app.extensions import db, migrate, login, cache, polygon_limiter, polygon_pool, quote_stream
+from app.utils.cache_monitor import register_collector
 from app.models import User
 import os
 from dotenv import load_dotenv
@@ -33,6 +34,17 @@ def create_app(test_config=None):
     print("Initializing cache...")
     cache.init_app(app)
 
+    # Client-side Polygon rate limiting (shared by all service calls)
+    polygon_limiter.init_app(app)
+
+    # Shared, kept-alive Polygon HTTP connection pool
+    polygon_pool.init_app(app)
+    register_collector('polygon_pool', polygon_pool.render_metrics)
+
+    # Live quotes pushed to dashboards over SSE (STREAMING_ENABLED)
+    quote_stream.init_app(app)
+    register_collector('quote_stream', quote_stream.render_metrics)
+
     @login.user_loader
     def load_user(user_id):
         return User.query.get(int(user_id))
@@ -76,6 +88,12 @@ def create_app(test_config=None):
     def health_check():
         return {'status': 'healthy'}, 200
 
+    # Cache metrics in Prometheus text format (per worker process)
+    @app.route('/metrics')
+    def metrics():
+        from app.utils.cache_monitor import render_metrics
+        return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
     # Import create_dash_app with error handling
     try:
         print("Creating Dash app...")
@@ -89,11 +107,27 @@ def create_app(test_config=None):
         import traceback
         traceback.print_exc()
 
-    from app.cli import delete_user, seed_demo_user, test_cache
+    from app.cli import (
+        cache_stats,
+        delete_user,
+        refresh_details,
+        refresh_prices,
+        seed_demo_user,
+        test_cache,
+        warm_cache,
+    )
 
     app.cli.add_command(delete_user)
     app.cli.add_command(seed_demo_user)
     app.cli.add_command(test_cache)
+    app.cli.add_command(refresh_prices)
+    app.cli.add_command(refresh_details)
+    app.cli.add_command(cache_stats)
+    app.cli.add_command(warm_cache)
+
+    # Optional pre-open / post-close cache warm-up (CACHE_WARMER_ENABLED)
+    from app.services.cache_warmer import init_cache_warmer
+    init_cache_warmer(app)
 
     print("✓ Flask application created successfully")
     return app
\ No newline at end of file
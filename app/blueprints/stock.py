@@ -1,5 +1,8 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from app.extensions import quote_stream
 from app.services import stock_services
+from app.utils.quote_stream import MAX_STREAM_SYMBOLS
+from app.utils.resample import interval_for_days, resample
 from datetime import datetime, timedelta
 
 bp = Blueprint('stock', __name__)
@@ -22,12 +25,39 @@ def stock_info(symbol):
 
 @bp.route('/api/<symbol>/historical')
 def stock_historical(symbol):
+    """Daily bars for the last ``days``; longer windows are resampled to weekly or monthly.
+
+    ``interval`` (``1-day``, ``1-week`` or ``1-month``) overrides the choice.
+    """
     days = request.args.get('days', default=30, type=int)
+    interval = request.args.get('interval') or interval_for_days(days)
+    if interval not in ('1-day', '1-week', '1-month'):
+        return jsonify({"error": "interval must be 1-day, 1-week or 1-month."}), 400
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days)
     data = stock_services.get_stock_data(
         symbol, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
     if not data:
         return jsonify({"error": "Could not fetch historical data. Please try again later."}), 500
-    return jsonify(data)
+    return jsonify(resample(data, interval).to_records())
+
 
+@bp.route('/api/stream')
+def stream_quotes():
+    """Server-sent live quotes for the comma-separated ``symbols``."""
+    if not quote_stream.enabled:
+        return '', 204  # tells EventSource not to reconnect
+    symbols = sorted({s.strip().upper() for s in request.args.get('symbols', '').split(',') if s.strip()})
+    if not symbols or len(symbols) > MAX_STREAM_SYMBOLS:
+        return jsonify({"error": f"Pass 1 to {MAX_STREAM_SYMBOLS} symbols."}), 400
+    subscription = quote_stream.subscribe(symbols)
+    if subscription is None:
+        return jsonify({"error": "Too many live-quote connections; try again later."}), 503
+    response = Response(
+        stream_with_context(quote_stream.events(subscription)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+    # Also release the slot if the stream is closed before it starts.
+    response.call_on_close(lambda: quote_stream.unsubscribe(subscription))
+    return response
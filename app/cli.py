@@ -35,8 +35,65 @@ def test_cache(symbol):
     """CLI command to test cache functionality."""
     from app.utils.cache_monitor import test_cache_functionality
 
-    test_cache_functionality(symbol)
-    click.echo(f"Cache test completed for {symbol}")
+    if test_cache_functionality(symbol):
+        click.echo(f"Cache test completed for {symbol}")
+    else:
+        click.echo(f"Cache test failed for {symbol}: the value read back did not match")
+
+
+@click.command('cache-stats')
+@with_appcontext
+def cache_stats():
+    """Show cache hit rates and negative-cache hits since the process started."""
+    from app.utils.cache_monitor import get_hit_rates, get_negative_cache_hits
+
+    rates = get_hit_rates()
+    if not rates:
+        click.echo("No cache reads yet")
+    for (data_type, backend), (hits, misses) in rates.items():
+        click.echo(f"{data_type} [{backend}]: {hits} hits, {misses} misses "
+                   f"({hits / (hits + misses):.0%} hit rate)")
+    for (data_type, reason), count in sorted(get_negative_cache_hits().items()):
+        click.echo(f"{data_type} negative ({reason}): {count}")
+
+
+@click.command('refresh-prices')
+@with_appcontext
+def refresh_prices():
+    """Refresh cached prices for all watchlisted symbols in one API call."""
+    from app.services.stock_services import refresh_tracked_prices
+
+    prices = refresh_tracked_prices()
+    click.echo(f"Refreshed prices for {len(prices)} symbols")
+
+
+@click.command('refresh-details')
+@click.argument('symbols', nargs=-1)
+@click.option('--concurrency', default=2, type=int, help='Symbols fetched in parallel.')
+@with_appcontext
+def refresh_details(symbols, concurrency):
+    """Re-fetch stale stored company details (or the given symbols')."""
+    from app.services.stock_services import refresh_company_details
+
+    results = refresh_company_details([s.upper() for s in symbols] or None, concurrency=concurrency)
+    click.echo(f"Refreshed details for {sum(results.values())}/{len(results)} symbols")
+
+
+@click.command('warm-cache')
+@click.argument('symbols', nargs=-1)
+@click.option('--concurrency', default=None, type=int, help='Symbols warmed in parallel.')
+@with_appcontext
+def warm_cache(symbols, concurrency):
+    """Prefetch details, history and prices for watchlisted (or given) symbols."""
+    from flask import current_app
+    from app.services.cache_warmer import warm_cache as run_warm_cache
+
+    concurrency = concurrency or current_app.config.get('CACHE_WARMER_CONCURRENCY', 2)
+    results = run_warm_cache([s.upper() for s in symbols] or None, concurrency=concurrency)
+    failed = [symbol for symbol, ok in results.items() if not ok]
+    click.echo(f"Warmed {len(results) - len(failed)}/{len(results)} symbols")
+    if failed:
+        click.echo(f"Incomplete: {', '.join(failed)}")
 
 
 @click.command("seed-demo-user")
@@ -2,9 +2,15 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
 from flask_caching import Cache
+from app.utils.polygon_pool import PolygonClientPool
+from app.utils.quote_stream import QuoteStream
+from app.utils.rate_limiter import PolygonRateLimiter
 
 db = SQLAlchemy()
 migrate = Migrate()
 login = LoginManager()
 login.login_view = 'auth.login'
-cache = Cache()
\ No newline at end of file
+cache = Cache()
+polygon_limiter = PolygonRateLimiter()
+polygon_pool = PolygonClientPool()
+quote_stream = QuoteStream()
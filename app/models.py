@@ -41,6 +41,41 @@ class Stock(db.Model):
         self.name = name
 
 
+class CompanyDetails(db.Model):
+    """Normalized Polygon ticker details, kept across deploys and cache flushes."""
+    __tablename__ = 'company_details'
+
+    DETAIL_FIELDS = ('name', 'description', 'market_cap', 'icon_url', 'logo_url', 'website',
+                     'list_date', 'exchange', 'sector', 'industry')
+
+    symbol = db.Column(db.String(10), primary_key=True)
+    name = db.Column(db.String(255))
+    description = db.Column(db.Text)
+    market_cap = db.Column(db.Float)
+    icon_url = db.Column(db.String(512))
+    logo_url = db.Column(db.String(512))
+    website = db.Column(db.String(255))
+    list_date = db.Column(db.String(10))
+    exchange = db.Column(db.String(16))
+    sector = db.Column(db.String(128))
+    industry = db.Column(db.String(128))
+    refreshed_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    def update(self, details, refreshed_at):
+        for field in self.DETAIL_FIELDS:
+            setattr(self, field, details.get(field))
+        self.refreshed_at = refreshed_at
+
+    def to_dict(self):
+        details = {field: getattr(self, field) for field in self.DETAIL_FIELDS}
+        details['description'] = details['description'] or ""
+        details['primary_exchange'] = details['exchange']
+        return details
+
+
 watchlist_stocks = db.Table('watchlist_stocks',
                             db.Column('watchlist_id', db.Integer, db.ForeignKey(
                                 'watchlist.id', ondelete='CASCADE'), primary_key=True),
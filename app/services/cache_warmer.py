@@ -0,0 +1,126 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from flask import Flask
+
+from app.services.stock_services import (
+    get_company_details,
+    get_stock_data,
+    get_tracked_symbols,
+    refresh_company_details,
+    refresh_tracked_prices,
+)
+from app.utils.concurrency import submit_with_app_context
+from app.utils.market_calendar import (
+    is_trading_day,
+    market_now,
+    next_trading_day,
+    session_close,
+    session_open,
+)
+from app.utils.rate_limiter import PRIORITY_PREFETCH, request_priority
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DAYS = 365 * 10           # same window the dashboard loads
+PRE_OPEN_LEAD = timedelta(minutes=30)
+POST_CLOSE_LAG = timedelta(minutes=15)
+
+
+def _warm_symbol(symbol: str, from_date: str, to_date: str) -> bool:
+    """Prefetch details and daily history for one symbol; True if both loaded."""
+    details = get_company_details(symbol)
+    history = get_stock_data(symbol, from_date, to_date)
+    return details is not None and len(history) > 0
+
+
+def warm_cache(symbols: Optional[List[str]] = None, concurrency: int = 2) -> Dict[str, bool]:
+    """Prefetch details, 10-year history and the latest price for watchlisted symbols.
+
+    Symbols default to every watchlisted one, most-watched first, and are
+    warmed in that order by ``concurrency`` workers. All requests run at
+    prefetch priority, so interactive users still go first at the rate
+    limiter. Prices come from one grouped-daily call. Returns whether each
+    symbol was fully warmed.
+    """
+    symbols = get_tracked_symbols() if symbols is None else symbols
+    if not symbols:
+        return {}
+
+    now = datetime.now()
+    from_date = (now - timedelta(days=HISTORY_DAYS)).strftime('%Y-%m-%d')
+    to_date = now.strftime('%Y-%m-%d')
+
+    with request_priority(PRIORITY_PREFETCH):
+        try:
+            prices = refresh_tracked_prices(symbols)
+        except Exception as e:
+            logger.warning(f"Price warm-up failed: {str(e)}")
+            prices = {}
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='cache-warmer') as executor:
+            futures = {
+                symbol: submit_with_app_context(executor, _warm_symbol, symbol, from_date, to_date)
+                for symbol in symbols
+            }
+            results = {symbol: future.result() and symbol in prices for symbol, future in futures.items()}
+
+    logger.info(f"Warmed {sum(results.values())}/{len(results)} symbols")
+    return results
+
+
+def next_warm_time(now: datetime) -> datetime:
+    """Return the next pre-open or post-close warm-up time after ``now`` (US/Eastern)."""
+    day = now.date()
+    while True:
+        if is_trading_day(day):
+            for run_at in (session_open(day) - PRE_OPEN_LEAD, session_close(day) + POST_CLOSE_LAG):
+                if run_at > now:
+                    return run_at
+        day = next_trading_day(day)
+
+
+class CacheWarmScheduler:
+    """Daemon thread that warms the cache before each open and after each close.
+
+    Each run first refreshes stale stored company details, then runs
+    :func:`warm_cache`.
+    """
+
+    def __init__(self, app: Flask, concurrency: int = 2):
+        self.app = app
+        self.concurrency = concurrency
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='cache-warm-scheduler', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while True:
+            now = market_now()
+            run_at = next_warm_time(now)
+            logger.info(f"Next cache warm-up at {run_at.isoformat()}")
+            if self._stop.wait((run_at - now).total_seconds()):
+                return
+            try:
+                with self.app.app_context():
+                    refresh_company_details(concurrency=self.concurrency)
+                    warm_cache(concurrency=self.concurrency)
+            except Exception as e:
+                logger.error(f"Scheduled cache warm-up failed: {str(e)}")
+
+
+def init_cache_warmer(app: Flask) -> Optional[CacheWarmScheduler]:
+    """Start the in-process scheduler when ``CACHE_WARMER_ENABLED`` is set."""
+    if not app.config.get('CACHE_WARMER_ENABLED'):
+        return None
+    scheduler = CacheWarmScheduler(app, concurrency=app.config.get('CACHE_WARMER_CONCURRENCY', 2))
+    scheduler.start()
+    return scheduler
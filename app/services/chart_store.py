@@ -0,0 +1,38 @@
+import hashlib
+from typing import Any, Dict, Optional
+
+from app.services.stock_services import get_stock_data
+from app.utils.bars import PRICE_COLUMNS, BarSeries
+
+
+def data_version(bars: BarSeries) -> str:
+    """Content hash identifying one version of a window's bars."""
+    digest = hashlib.blake2b(digest_size=8)
+    for name in ('timestamps',) + PRICE_COLUMNS:
+        digest.update(getattr(bars, name).tobytes())
+    return digest.hexdigest()
+
+
+def make_chart_handle(symbol: str, bars: BarSeries, from_date: str, to_date: str) -> Dict[str, str]:
+    """The small handle the browser holds instead of a chart's bars.
+
+    It names the symbol, the history window and the version of ``bars``; the
+    bars themselves are already cached server-side by :func:`get_stock_data`,
+    so no extra copy is stored.
+    """
+    return {'symbol': symbol, 'from': from_date, 'to': to_date, 'version': data_version(bars)}
+
+
+def get_chart_bars(handle: Optional[Dict[str, Any]]) -> Optional[BarSeries]:
+    """Return the daily bars behind ``handle`` from the symbol's cached history.
+
+    Returns None when the bars have changed since the handle was issued (a
+    new session closed, or a split re-adjusted the history), so the caller
+    can reissue the handle instead of mixing two versions on one page.
+    """
+    if not handle:
+        return BarSeries.empty()
+    bars = get_stock_data(handle['symbol'], handle['from'], handle['to'])
+    if data_version(bars) != handle.get('version'):
+        return None
+    return bars
@@ -0,0 +1,37 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, NamedTuple, Optional
+
+from app.services.stock_services import get_company_details, get_stock_data, get_stock_price
+from app.utils.bars import BarSeries
+from app.utils.concurrency import submit_with_app_context
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='quote-bundle')
+
+
+class QuoteBundle(NamedTuple):
+    """Everything the dashboard shows for one symbol."""
+    symbol: str
+    history: BarSeries
+    price: Optional[float]
+    details: Optional[Dict[str, Any]]
+
+
+def get_quote_bundle(symbol: str, from_date: str, to_date: str) -> QuoteBundle:
+    """Fetch history, latest price and company details for ``symbol`` in parallel.
+
+    The three lookups are independent, so on a cold cache the wait is bounded
+    by the slowest Polygon round trip rather than their sum. Each service
+    already handles its own errors, returning empty/None values.
+    """
+    history = submit_with_app_context(_executor, get_stock_data, symbol, from_date, to_date)
+    price = submit_with_app_context(_executor, get_stock_price, symbol)
+    details = submit_with_app_context(_executor, get_company_details, symbol)
+    return QuoteBundle(
+        symbol=symbol,
+        history=history.result(),
+        price=price.result(),
+        details=details.result(),
+    )
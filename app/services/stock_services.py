@@ -1,35 +1,54 @@
-from typing import Optional, Dict, List, Any
-from datetime import datetime, timedelta, time
-from zoneinfo import ZoneInfo
+from typing import Optional, Dict, List, Any, Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 import logging
 import os
 from dotenv import load_dotenv
 from polygon import RESTClient
-from app.extensions import db, cache
-from app.models import Stock
-from app.utils.cache_manager import StockCache
+from app.extensions import db, cache, polygon_limiter, polygon_pool, quote_stream
+from app.models import CompanyDetails, Stock, watchlist_stocks
+from app.utils.bar_store import BarStore
+from app.utils.bars import BarSeries
+from app.utils.cache_manager import StockCache, SymbolNotFound
+from app.utils.concurrency import submit_with_app_context
+from app.utils.market_calendar import (
+    latest_session_date,
+    market_now,
+    most_recent_completed_session,
+    previous_trading_day,
+    session_bounds,
+)
+from app.utils.rate_limiter import PRIORITY_BACKFILL, PRIORITY_PREFETCH, request_priority
+from app.utils.resample import resample_minutes
+from app.utils.single_flight import SingleFlight
+from sqlalchemy import func
 from sqlalchemy.exc import IntegrityError
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-EASTERN_TZ = ZoneInfo("America/New_York")
-MARKET_OPEN_ET = time(9, 30)
-MARKET_CLOSE_ET = time(16, 0)
+# Stored company details older than this are re-fetched by refresh_company_details.
+DETAILS_REFRESH_AFTER = timedelta(days=7)
+
+# A streamed quote younger than this (seconds) is used instead of the cached price.
+LIVE_QUOTE_MAX_AGE = 60
+
+# Concurrent get_stock_data calls for the same window share one BarStore load.
+_history_loads = SingleFlight()
 
 api_key = os.getenv('POLYGON_API_KEY')
-polygon_client = RESTClient(api_key) if api_key else None
+polygon_client = None
 
 
 def _get_client() -> RESTClient:
-    """Return a Polygon RESTClient, creating it if necessary."""
+    """Return the shared, thread-safe Polygon RESTClient, creating it if necessary."""
     global polygon_client
     if polygon_client is None:
         key = os.getenv('POLYGON_API_KEY')
         if not key:
             raise RuntimeError('Polygon API key not configured')
-        polygon_client = RESTClient(key)
+        polygon_client = polygon_pool.client(key)
     return polygon_client
 
 
@@ -39,142 +58,205 @@ def is_rate_limit_error(exc: Exception) -> bool:
     return '429' in message or 'too many' in message
 
 
+def is_not_found_error(exc: Exception) -> bool:
+    """Return True when an exception is a Polygon 404 / NOT_FOUND response."""
+    message = str(exc).lower()
+    return '404' in message or 'not_found' in message or 'not found' in message
+
+
+def _call_polygon(request: Callable[[RESTClient], Any], unknown_on_404: bool = False) -> Any:
+    """Run ``request`` against the Polygon client under the shared rate limiter.
+
+    Waits for a slot at the caller's priority (see ``request_priority``) and
+    reports 429 responses so the limiter can back off. With
+    ``unknown_on_404`` (endpoints whose 404 means the ticker does not exist,
+    such as ticker details) not-found responses are raised as
+    ``SymbolNotFound`` so they are negatively cached as ``not_found``.
+    Elsewhere a 404 can just mean "no data yet" and is raised unchanged.
+    """
+    polygon_limiter.acquire()
+    try:
+        result = request(_get_client())
+    except Exception as e:
+        if is_rate_limit_error(e):
+            polygon_limiter.record_rate_limited()
+        elif unknown_on_404 and is_not_found_error(e):
+            raise SymbolNotFound(str(e)) from e
+        raise
+    polygon_limiter.record_success()
+    return result
+
+
+def _fetch_price(symbol: str) -> Optional[float]:
+    date = get_most_recent_trading_day()
+    try:
+        resp = _call_polygon(lambda client: client.get_daily_open_close_agg(symbol, date))
+    except Exception as e:
+        # Open-close answers NOT_FOUND for a valid ticker with no bar on that
+        # date (not yet published after the close, halted all day): an empty
+        # result, retried soon, not an unknown symbol.
+        if is_not_found_error(e):
+            logger.info(f"No open/close bar for {symbol} on {date}")
+            return None
+        raise
+    return resp.close if resp else None
+
+
 def get_stock_price(symbol: str) -> Optional[float]:
-    """Get current stock price from Polygon API (cached for 5 minutes)."""
+    """Get current stock price: the live streamed quote if fresh, else from Polygon (cached)."""
+    quote = quote_stream.latest(symbol)
+    if quote is not None and quote.age() <= LIVE_QUOTE_MAX_AGE:
+        return quote.price
     stock_cache = StockCache(cache)
-    cached_price = stock_cache.get_cached_data(symbol, "price")
-    if cached_price is not None:
-        return cached_price
-
     try:
-        date = get_most_recent_trading_day()
-        client = _get_client()
-        resp = client.get_daily_open_close_agg(symbol, date)
-        price = resp.close if resp else None
-        if price is not None:
-            stock_cache.set_cached_data(symbol, "price", price)
-        return price
+        return stock_cache.get_or_fetch(symbol, "price", lambda: _fetch_price(symbol))
     except Exception as e:
         logger.error(f"Error fetching stock price for {symbol}: {str(e)}")
         return None
 
 
-def get_stock_data(symbol: str, from_date: str, to_date: str) -> List[Dict[str, Any]]:
-    """Get historical OHLCV data from Polygon API (cached for 1 hour)."""
-    stock_cache = StockCache(cache)
-    cached_data = stock_cache.get_cached_data(
-        symbol, "historical", start_date=from_date, end_date=to_date
-    )
-    if cached_data is not None:
-        return cached_data
+def refresh_tracked_prices(symbols: Optional[List[str]] = None) -> Dict[str, float]:
+    """Fill the price cache for every tracked symbol with one grouped-daily call.
+
+    Pulls the grouped daily aggregates for the most recent trading day (one
+    request for the whole market) and caches the close of each symbol in
+    ``symbols`` (default: every symbol on a watchlist). Returns the prices set.
+    """
+    wanted = set(symbols if symbols is not None else get_tracked_symbols())
+    if not wanted:
+        return {}
 
+    date = get_most_recent_trading_day()
+    with request_priority(PRIORITY_PREFETCH):
+        aggs = _call_polygon(lambda client: client.get_grouped_daily_aggs(date, adjusted=True))
+
+    stock_cache = StockCache(cache)
+    prices = {}
+    for agg in aggs or []:
+        if agg.ticker in wanted and agg.close is not None:
+            stock_cache.store_fetched(agg.ticker, "price", agg.close)
+            prices[agg.ticker] = agg.close
+
+    missing = wanted - prices.keys()
+    if missing:
+        logger.info(f"No grouped daily bar on {date} for: {', '.join(sorted(missing))}")
+    return prices
+
+
+def _fetch_daily_bars(symbol: str, from_date: str, to_date: str) -> BarSeries:
+    """Fetch daily OHLCV bars for ``[from_date, to_date]`` from Polygon."""
+    aggs = _call_polygon(lambda client: client.get_aggs(
+        ticker=symbol,
+        multiplier=1,
+        timespan="day",
+        from_=from_date,
+        to=to_date,
+        adjusted=True,
+        sort="asc",
+        limit=50000,
+    ))
+    return BarSeries.from_aggs(aggs)
+
+
+def _fetch_stock_data(symbol: str, from_date: str, to_date: str) -> BarSeries:
+    bar_store = BarStore(cache)
+    entry = bar_store.load(symbol)
+    for gap_start, gap_end in bar_store.plan_missing_ranges(entry, from_date, to_date):
+        bars = _fetch_daily_bars(symbol, gap_start, gap_end)
+        entry = bar_store.merge(symbol, entry, gap_start, gap_end, bars)
+    return bar_store.slice(entry, from_date, to_date)
+
+
+def get_stock_data(symbol: str, from_date: str, to_date: str) -> BarSeries:
+    """Get historical daily OHLCV bars as a :class:`BarSeries`.
+
+    Bars are served from the per-symbol :class:`BarStore`, the only cached copy
+    of a symbol's daily history; only the date ranges it is missing (usually
+    the last day or two, refreshed hourly) are fetched from Polygon.
+    Concurrent requests for one window share a load, and failed or empty
+    windows are negatively cached.
+    """
+    stock_cache = StockCache(cache)
+    window = {'start_date': from_date, 'end_date': to_date}
+    if stock_cache.get_negative(symbol, "historical", **window) is not None:
+        return BarSeries.empty()
     try:
-        client = _get_client()
-        aggs = client.get_aggs(
-            ticker=symbol,
-            multiplier=1,
-            timespan="day",
-            from_=from_date,
-            to=to_date,
-            adjusted=True,
-            sort="asc",
-            limit=50000,
-        )
-
-        historical_data = []
-        for agg in aggs or []:
-            historical_data.append({
-                'date': datetime.fromtimestamp(agg.timestamp / 1000).strftime('%Y-%m-%d'),
-                'open': agg.open,
-                'high': agg.high,
-                'low': agg.low,
-                'close': agg.close,
-                'volume': agg.volume,
-            })
-
-        if historical_data:
-            stock_cache.set_cached_data(
-                symbol, "historical", historical_data,
-                start_date=from_date, end_date=to_date,
-            )
-        return historical_data
+        bars = _history_loads.do(
+            f"{symbol}:{from_date}:{to_date}", lambda: _fetch_stock_data(symbol, from_date, to_date))
     except Exception as e:
+        stock_cache.set_negative(symbol, "historical", 'error', **window)
         logger.error(f"Error fetching historical data for {symbol}: {str(e)}")
-        return []
-
-
-def get_intraday_stock_data(
-    symbol: str,
-    max_lookback_days: int = 7,
-    aggregate_configs=None,
-) -> List[Dict[str, Any]]:
-    """Fetch regular-session intraday bars for the latest available session (cached 5 min)."""
+        return BarSeries.empty()
+    if not bars:
+        stock_cache.set_negative(symbol, "historical", 'empty', **window)
+    return bars
+
+
+def _regular_session_bars(aggs, from_date: str, to_date: str, interval: str) -> BarSeries:
+    """Parse intraday aggs into a BarSeries restricted to regular-session hours."""
+    bounds = session_bounds(from_date, to_date)
+    return BarSeries.from_aggs(aggs, interval=interval).within(bounds)
+
+
+def _fetch_session_bars(symbol: str, date_str: str, since: Optional[int] = None) -> BarSeries:
+    """Fetch 1-minute regular-session bars of one session, optionally from epoch-ms ``since`` on."""
+    aggs = _call_polygon(lambda client: client.get_aggs(
+        ticker=symbol,
+        multiplier=1,
+        timespan="minute",
+        from_=date_str if since is None else since,
+        to=date_str,
+        adjusted=True,
+        sort="asc",
+        limit=50000,
+    ))
+    return _regular_session_bars(aggs, date_str, date_str, interval="1-minute")
+
+
+def _fetch_intraday_data(symbol: str, cached: Optional[BarSeries] = None) -> BarSeries:
+    """Fetch 1-minute regular-session bars for the latest session that has opened.
+
+    The session is resolved from the NYSE calendar up front, so weekends and
+    holidays cost no requests. If it has no bars yet (e.g. just after the
+    open) the previous session is tried once.
+
+    ``cached`` is the series held so far. Its last bar is the high-water
+    mark: when it belongs to the current session only bars from the mark on
+    are requested (the mark bar itself may still have been forming) and
+    merged in; a completed earlier session is reused as is.
+    """
+    session = latest_session_date(market_now())
+    for day in (session, previous_trading_day(session)):
+        date_str = day.strftime('%Y-%m-%d')
+        if cached and cached.last_date == date_str:
+            if day != session:
+                return cached
+            return cached.merge(_fetch_session_bars(symbol, date_str, since=int(cached.timestamps[-1])))
+        intraday_data = _fetch_session_bars(symbol, date_str)
+        if intraday_data:
+            return intraday_data
+        logger.info(f"No intraday bars for {symbol} on {date_str}")
+
+    return BarSeries.empty(interval='1-minute')
+
+
+def get_intraday_stock_data(symbol: str, minutes: int = 1) -> BarSeries:
+    """Fetch regular-session intraday bars for the latest available session (cached 5 min).
+
+    Polygon is only asked for 1-minute bars; coarser ``minutes`` intervals
+    are resampled from the cached series. Refreshes during a session only
+    fetch the bars added since the cached series' last bar.
+    """
     stock_cache = StockCache(cache)
-    cached_data = stock_cache.get_cached_data(symbol, "intraday")
-    if cached_data is not None:
-        return cached_data
-
-    aggregate_configs = aggregate_configs or ((1, "minute"), (5, "minute"))
     try:
-        candidate_date = datetime.now(EASTERN_TZ).date()
-        attempted_weekdays = 0
-
-        while attempted_weekdays < max_lookback_days:
-            if candidate_date.weekday() >= 5:
-                candidate_date -= timedelta(days=1)
-                continue
-
-            attempted_weekdays += 1
-            date_str = candidate_date.strftime('%Y-%m-%d')
-            for multiplier, timespan in aggregate_configs:
-                try:
-                    client = _get_client()
-                    aggs = client.get_aggs(
-                        ticker=symbol,
-                        multiplier=multiplier,
-                        timespan=timespan,
-                        from_=date_str,
-                        to=date_str,
-                        adjusted=True,
-                        sort="asc",
-                        limit=50000,
-                    )
-                except Exception as e:
-                    logger.warning(
-                        f"Intraday {multiplier}-{timespan} data unavailable for "
-                        f"{symbol} on {date_str}: {str(e)}"
-                    )
-                    continue
-
-                intraday_data = []
-                for agg in aggs or []:
-                    bar_dt = datetime.fromtimestamp(
-                        agg.timestamp / 1000, tz=ZoneInfo("UTC")
-                    ).astimezone(EASTERN_TZ)
-                    if MARKET_OPEN_ET <= bar_dt.time() <= MARKET_CLOSE_ET:
-                        intraday_data.append({
-                            'datetime': bar_dt.isoformat(),
-                            'date': bar_dt.strftime('%Y-%m-%d'),
-                            'time': bar_dt.strftime('%H:%M'),
-                            'open': agg.open,
-                            'high': agg.high,
-                            'low': agg.low,
-                            'close': agg.close,
-                            'volume': agg.volume,
-                            'resolution': 'intraday',
-                            'interval': f"{multiplier}-{timespan}",
-                        })
-
-                if intraday_data:
-                    stock_cache.set_cached_data(symbol, "intraday", intraday_data)
-                    return intraday_data
-
-            candidate_date -= timedelta(days=1)
-
-        return []
+        bars = stock_cache.get_or_fetch(symbol, "intraday", lambda: _fetch_intraday_data(
+            symbol, stock_cache.get_cached_data(symbol, "intraday")))
     except Exception as e:
         logger.error(f"Error fetching intraday data for {symbol}: {str(e)}")
-        return []
+        bars = None
+    if bars is None:
+        bars = BarSeries.empty(interval='1-minute')
+    return resample_minutes(bars, minutes)
 
 
 def _as_text(value: Any, default: str = 'N/A') -> str:
@@ -192,24 +274,31 @@ def _append_api_key(url: Optional[str]) -> Optional[str]:
     return f"{url}{separator}apiKey={api_key}"
 
 
-def get_company_details(symbol: str) -> Optional[Dict[str, Any]]:
-    """Get company details from Polygon API (cached for 24 hours)."""
-    stock_cache = StockCache(cache)
-    cached_details = stock_cache.get_cached_data(symbol, "details")
-    if cached_details is not None:
-        return cached_details
-
-    try:
-        client = _get_client()
-        ticker_details = client.get_ticker_details(symbol)
-        if not ticker_details:
-            return None
-
-        icon_url = None
-        logo_url = None
+def _fetch_company_details(symbol: str) -> Optional[Dict[str, Any]]:
+    ticker_details = _call_polygon(lambda client: client.get_ticker_details(symbol), unknown_on_404=True)
+    if not ticker_details:
+        return None
 
-        if hasattr(ticker_details, 'branding'):
-            branding = ticker_details.branding
+    icon_url = None
+    logo_url = None
+
+    if hasattr(ticker_details, 'branding'):
+        branding = ticker_details.branding
+        if isinstance(branding, dict):
+            icon_url = branding.get('icon_url')
+            logo_url = branding.get('logo_url')
+        elif branding is not None:
+            icon_url = getattr(branding, 'icon_url', None)
+            logo_url = getattr(branding, 'logo_url', None)
+            if icon_url is not None and not isinstance(icon_url, str):
+                icon_url = None
+            if logo_url is not None and not isinstance(logo_url, str):
+                logo_url = None
+
+    if not icon_url and hasattr(ticker_details, 'results'):
+        results = ticker_details.results
+        if hasattr(results, 'branding'):
+            branding = results.branding
             if isinstance(branding, dict):
                 icon_url = branding.get('icon_url')
                 logo_url = branding.get('logo_url')
@@ -221,102 +310,170 @@ def get_company_details(symbol: str) -> Optional[Dict[str, Any]]:
                 if logo_url is not None and not isinstance(logo_url, str):
                     logo_url = None
 
-        if not icon_url and hasattr(ticker_details, 'results'):
-            results = ticker_details.results
-            if hasattr(results, 'branding'):
-                branding = results.branding
-                if isinstance(branding, dict):
-                    icon_url = branding.get('icon_url')
-                    logo_url = branding.get('logo_url')
-                elif branding is not None:
-                    icon_url = getattr(branding, 'icon_url', None)
-                    logo_url = getattr(branding, 'logo_url', None)
-                    if icon_url is not None and not isinstance(icon_url, str):
-                        icon_url = None
-                    if logo_url is not None and not isinstance(logo_url, str):
-                        logo_url = None
-
-        icon_url = _append_api_key(icon_url)
-        logo_url = _append_api_key(logo_url)
-
-        name = symbol
-        if hasattr(ticker_details, 'name'):
-            name = ticker_details.name
-        elif hasattr(ticker_details, 'results') and hasattr(ticker_details.results, 'name'):
-            name = ticker_details.results.name
-
-        market_cap = getattr(ticker_details, 'market_cap', None)
-        if market_cap is None and hasattr(ticker_details, 'results'):
-            market_cap = getattr(ticker_details.results, 'market_cap', None)
-
-        website = getattr(ticker_details, 'homepage_url', None)
-        if website is None and hasattr(ticker_details, 'results'):
-            website = getattr(ticker_details.results, 'homepage_url', None)
-
-        list_date = getattr(ticker_details, 'list_date', None)
-        if list_date is None and hasattr(ticker_details, 'results'):
-            list_date = getattr(ticker_details.results, 'list_date', None)
-
-        exchange = getattr(ticker_details, 'primary_exchange', None)
-        if exchange is None and hasattr(ticker_details, 'results'):
-            exchange = getattr(ticker_details.results, 'primary_exchange', None)
-
-        description = ""
-        raw_description = getattr(ticker_details, 'description', None)
-        if not isinstance(raw_description, str) and hasattr(ticker_details, 'results'):
-            raw_description = getattr(ticker_details.results, 'description', None)
-        if isinstance(raw_description, str) and raw_description:
-            description = raw_description[:150]
-            if len(raw_description) > 150:
-                description += "..."
-
-        name = _as_text(name, symbol)
-        market_cap = _as_number(market_cap)
-        website = _as_text(website, '') or None
-        list_date = _as_text(list_date, '') or None
-        exchange = _as_text(exchange, '') or None
-
-        details = {
-            'name': name,
-            'description': description,
-            'market_cap': market_cap,
-            'icon_url': icon_url,
-            'logo_url': logo_url,
-            'website': website,
-            'list_date': list_date,
-            'exchange': exchange,
-            'primary_exchange': exchange,
-            'sector': _as_text(getattr(ticker_details, 'sector', 'N/A')),
-            'industry': _as_text(getattr(ticker_details, 'industry', 'N/A')),
-        }
-        stock_cache.set_cached_data(symbol, "details", details)
-        return details
+    icon_url = icon_url if isinstance(icon_url, str) and icon_url else None
+    logo_url = logo_url if isinstance(logo_url, str) and logo_url else None
+
+    name = symbol
+    if hasattr(ticker_details, 'name'):
+        name = ticker_details.name
+    elif hasattr(ticker_details, 'results') and hasattr(ticker_details.results, 'name'):
+        name = ticker_details.results.name
+
+    market_cap = getattr(ticker_details, 'market_cap', None)
+    if market_cap is None and hasattr(ticker_details, 'results'):
+        market_cap = getattr(ticker_details.results, 'market_cap', None)
+
+    website = getattr(ticker_details, 'homepage_url', None)
+    if website is None and hasattr(ticker_details, 'results'):
+        website = getattr(ticker_details.results, 'homepage_url', None)
+
+    list_date = getattr(ticker_details, 'list_date', None)
+    if list_date is None and hasattr(ticker_details, 'results'):
+        list_date = getattr(ticker_details.results, 'list_date', None)
+
+    exchange = getattr(ticker_details, 'primary_exchange', None)
+    if exchange is None and hasattr(ticker_details, 'results'):
+        exchange = getattr(ticker_details.results, 'primary_exchange', None)
+
+    description = ""
+    raw_description = getattr(ticker_details, 'description', None)
+    if not isinstance(raw_description, str) and hasattr(ticker_details, 'results'):
+        raw_description = getattr(ticker_details.results, 'description', None)
+    if isinstance(raw_description, str) and raw_description:
+        description = raw_description[:150]
+        if len(raw_description) > 150:
+            description += "..."
+
+    name = _as_text(name, symbol)
+    market_cap = _as_number(market_cap)
+    website = _as_text(website, '') or None
+    list_date = _as_text(list_date, '') or None
+    exchange = _as_text(exchange, '') or None
+
+    details = {
+        'name': name,
+        'description': description,
+        'market_cap': market_cap,
+        'icon_url': icon_url,
+        'logo_url': logo_url,
+        'website': website,
+        'list_date': list_date,
+        'exchange': exchange,
+        'primary_exchange': exchange,
+        'sector': _as_text(getattr(ticker_details, 'sector', 'N/A')),
+        'industry': _as_text(getattr(ticker_details, 'industry', 'N/A')),
+    }
+    return details
+
+
+def _with_api_key(details: Dict[str, Any]) -> Dict[str, Any]:
+    """Return ``details`` with the API key appended to its branding URLs.
+
+    The key is added on the way out so it is never stored in the cache or
+    the database.
+    """
+    return {
+        **details,
+        'icon_url': _append_api_key(details.get('icon_url')),
+        'logo_url': _append_api_key(details.get('logo_url')),
+    }
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _upsert_company_details(symbol: str, details: Dict[str, Any]) -> None:
+    row = db.session.get(CompanyDetails, symbol) or CompanyDetails(symbol)
+    row.update(details, _utcnow())
+    db.session.add(row)
+
+
+def _load_company_details(symbol: str) -> Optional[Dict[str, Any]]:
+    """Read details from the ``company_details`` table, fetching and storing them if absent."""
+    try:
+        row = db.session.get(CompanyDetails, symbol)
+        if row is not None:
+            return row.to_dict()
+    except Exception as e:
+        db.session.rollback()
+        logger.warning(f"Could not read stored details for {symbol}: {str(e)}")
+
+    details = _fetch_company_details(symbol)
+    if details:
+        try:
+            _upsert_company_details(symbol, details)
+            db.session.commit()
+        except Exception as e:  # e.g. a concurrent insert of the same symbol
+            db.session.rollback()
+            logger.warning(f"Could not store details for {symbol}: {str(e)}")
+    return details
+
+
+def get_company_details(symbol: str) -> Optional[Dict[str, Any]]:
+    """Get company details (cached for 24 hours, persisted in ``company_details``)."""
+    stock_cache = StockCache(cache)
+    try:
+        details = stock_cache.get_or_fetch(symbol, "details", lambda: _load_company_details(symbol))
     except Exception as e:
         logger.error(f"Error fetching company details for {symbol}: {str(e)}")
         return None
+    return _with_api_key(details) if details else None
+
+
+def refresh_company_details(
+    symbols: Optional[List[str]] = None,
+    max_age: timedelta = DETAILS_REFRESH_AFTER,
+    concurrency: int = 2,
+) -> Dict[str, bool]:
+    """Re-fetch stored company details in bulk.
+
+    By default refreshes rows older than ``max_age`` plus watchlisted symbols
+    that have no row yet; explicit ``symbols`` are always refreshed. Fetches
+    run ``concurrency`` at a time at backfill priority. Each symbol is
+    committed on its own, so one row the database rejects does not lose the
+    rest. Returns whether each symbol was updated.
+    """
+    if symbols is None:
+        cutoff = _utcnow() - max_age
+        stored = {row.symbol: row.refreshed_at for row in CompanyDetails.query.all()}
+        symbols = [symbol for symbol, refreshed_at in stored.items() if refreshed_at < cutoff]
+        symbols += [symbol for symbol in get_tracked_symbols() if symbol not in stored]
+    if not symbols:
+        return {}
 
+    stock_cache = StockCache(cache)
+    results = {}
+    with request_priority(PRIORITY_BACKFILL), \
+            ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='details-refresh') as executor:
+        futures = {
+            symbol: submit_with_app_context(executor, _fetch_company_details, symbol)
+            for symbol in symbols
+        }
+        for symbol, future in futures.items():
+            try:
+                details = future.result()
+            except Exception as e:
+                logger.warning(f"Could not refresh details for {symbol}: {str(e)}")
+                details = None
+            results[symbol] = bool(details)
+            if details:
+                stock_cache.set_cached_data(symbol, "details", details)
+                try:
+                    _upsert_company_details(symbol, details)
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning(f"Could not store details for {symbol}: {str(e)}")
+                    results[symbol] = False
 
-def get_most_recent_trading_day() -> str:
-    """Calculate the most recent trading day."""
-    now = datetime.now()
-    market_close_time = now.replace(hour=16, minute=0, second=0, microsecond=0)
-
-    if now <= market_close_time and now.weekday() < 5:
-        most_recent_trading_day = now - timedelta(days=1) if now.weekday() > 0 else now
-    else:
-        days_to_subtract = 1
-        if now.weekday() == 5:
-            days_to_subtract = 1
-        elif now.weekday() == 6:
-            days_to_subtract = 2
-        most_recent_trading_day = now - timedelta(days=days_to_subtract)
+    logger.info(f"Refreshed details for {sum(results.values())}/{len(results)} symbols")
+    return results
 
-    if most_recent_trading_day.weekday() == 5:
-        most_recent_trading_day -= timedelta(days=1)
-    elif most_recent_trading_day.weekday() == 6:
-        most_recent_trading_day -= timedelta(days=2)
 
-    return most_recent_trading_day.strftime('%Y-%m-%d')
+def get_most_recent_trading_day() -> str:
+    """Return the most recent NYSE session that has closed (skips weekends and holidays)."""
+    return most_recent_completed_session().strftime('%Y-%m-%d')
 
 
 def get_all_stocks() -> List[Stock]:
@@ -324,6 +481,19 @@ def get_all_stocks() -> List[Stock]:
     return Stock.query.all()
 
 
+def get_tracked_symbols() -> List[str]:
+    """Return the distinct watchlisted symbols, most-watched first."""
+    watchers = func.count(watchlist_stocks.c.watchlist_id)
+    rows = (
+        db.session.query(Stock.symbol)
+        .join(watchlist_stocks, watchlist_stocks.c.stock_id == Stock.id)
+        .group_by(Stock.symbol)
+        .order_by(watchers.desc(), Stock.symbol)
+        .all()
+    )
+    return [row.symbol for row in rows]
+
+
 def get_stock_by_symbol(symbol: str) -> Optional[Stock]:
     """Get a stock by its symbol from the database."""
     return Stock.query.filter_by(symbol=symbol).first()
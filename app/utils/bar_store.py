@@ -0,0 +1,129 @@
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from flask_caching import Cache
+
+from .bars import BarSeries
+from .cache_manager import DEFAULT_TIMEOUTS, IMMUTABLE_TIMEOUT, StockCache
+from .market_calendar import EASTERN_TZ, is_market_open, last_market_change, latest_session_date
+
+DATE_FORMAT = '%Y-%m-%d'
+
+
+def _shift_date(date_str: str, days: int) -> str:
+    return (datetime.strptime(date_str, DATE_FORMAT) + timedelta(days=days)).strftime(DATE_FORMAT)
+
+
+def plan_missing_ranges(
+    entry: Optional[Dict[str, Any]],
+    from_date: str,
+    to_date: str,
+    refresh_after: int = DEFAULT_TIMEOUTS['historical'],
+    now: Optional[float] = None,
+) -> List[Tuple[str, str]]:
+    """Return the (from, to) date ranges that must be fetched to cover a window.
+
+    ``entry`` is a stored bar-store entry (``start``/``end`` cover the windows
+    that were requested so far, ``bars`` is a :class:`BarSeries`). Only the head and
+    tail outside that coverage are planned, and they always extend to its
+    edges so the coverage stays contiguous.
+
+    The tail is only re-fetched when the entry is not current: it was fetched
+    before the latest session open/close, or more than ``refresh_after``
+    seconds ago during a live session. Completed sessions are never re-fetched,
+    so off-hours requests are answered from the store alone. A stale tail is
+    re-planned from the last stored bar so a partial session gets replaced by
+    its final values.
+    """
+    if not entry or not entry.get('bars'):
+        return [(from_date, to_date)]
+
+    now = time.time() if now is None else now
+    market_time = datetime.fromtimestamp(now, tz=EASTERN_TZ)
+    fetched_at = entry.get('fetched_at', 0)
+    current = fetched_at >= last_market_change(market_time).timestamp() and (
+        not is_market_open(market_time) or now - fetched_at <= refresh_after
+    )
+    covered_start, covered_end = entry['start'], entry['end']
+    ranges = []
+
+    if from_date < covered_start:
+        ranges.append((from_date, _shift_date(covered_start, -1)))
+
+    last_bar_date = entry['bars'].last_date
+    if to_date > covered_end and (not current or covered_end < latest_session_date(market_time).isoformat()):
+        ranges.append((covered_end, to_date))
+    elif to_date >= last_bar_date and not current:
+        ranges.append((max(from_date, last_bar_date), to_date))
+
+    return ranges
+
+
+class BarStore:
+    """Per-symbol daily bar store kept in the shared cache backend.
+
+    Entries do not expire, so on Redis deployments the store survives restarts
+    and is shared between workers; callers fetch only the ranges returned by
+    :func:`plan_missing_ranges` and merge them in.
+
+    Merging never re-fetches stored bars, so an entry is discarded once it is
+    ``max_age`` seconds old and the whole window is fetched again. Bars are
+    split-adjusted, and this bounds how long bars from before a split keep
+    their unadjusted prices.
+    """
+
+    def __init__(
+        self,
+        cache: Cache,
+        refresh_after: int = DEFAULT_TIMEOUTS['historical'],
+        max_age: int = IMMUTABLE_TIMEOUT,
+    ):
+        self.cache = cache
+        self.store = StockCache(cache)
+        self.refresh_after = refresh_after
+        self.max_age = max_age
+
+    def _get_store_key(self, symbol: str) -> str:
+        return f"stock:{symbol}:bars"
+
+    def load(self, symbol: str) -> Optional[Dict[str, Any]]:
+        entry = self.store.get_value(self._get_store_key(symbol))
+        if entry is not None and not isinstance(entry.get('bars'), BarSeries):
+            return None  # written by an older release; refetch it
+        if entry is not None and time.time() - entry.get('created_at', 0) > self.max_age:
+            return None  # re-fetch in full to pick up split adjustments
+        return entry
+
+    def plan_missing_ranges(
+        self, entry: Optional[Dict[str, Any]], from_date: str, to_date: str
+    ) -> List[Tuple[str, str]]:
+        return plan_missing_ranges(entry, from_date, to_date, refresh_after=self.refresh_after)
+
+    def merge(
+        self,
+        symbol: str,
+        entry: Optional[Dict[str, Any]],
+        from_date: str,
+        to_date: str,
+        bars: BarSeries,
+    ) -> Optional[Dict[str, Any]]:
+        """Merge freshly fetched bars for ``[from_date, to_date]`` and persist the entry."""
+        if not bars and not (entry and entry.get('bars')):
+            return entry
+
+        merged = {
+            'start': min(from_date, entry['start']) if entry else from_date,
+            'end': max(to_date, entry['end']) if entry else to_date,
+            'bars': entry['bars'].merge(bars) if entry else bars,
+            'fetched_at': time.time(),
+            'created_at': entry['created_at'] if entry else time.time(),
+        }
+        self.store.set_value(self._get_store_key(symbol), merged, timeout=0)
+        return merged
+
+    @staticmethod
+    def slice(entry: Optional[Dict[str, Any]], from_date: str, to_date: str) -> BarSeries:
+        """Return the stored bars dated within ``[from_date, to_date]``."""
+        if not entry:
+            return BarSeries.empty()
+        return entry['bars'].between(from_date, to_date)
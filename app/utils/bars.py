@@ -0,0 +1,196 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .market_calendar import EASTERN_TZ
+
+PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def date_to_epoch_ms(date_str: str, days: int = 0) -> int:
+    """Return epoch milliseconds of midnight Eastern on ``date_str`` (+ ``days``)."""
+    day = datetime.strptime(date_str, '%Y-%m-%d') + timedelta(days=days)
+    return int(day.replace(tzinfo=EASTERN_TZ).timestamp() * 1000)
+
+
+class BarSeries:
+    """Columnar OHLCV bars backed by typed NumPy arrays.
+
+    Timestamps are int64 epoch milliseconds (Polygon's bar start times) and
+    the price/volume columns are float64, which keeps cached histories small
+    and cheap to pickle. Display fields (``date``, ``datetime``, ``time``) are
+    formatted only when the bars are converted with :meth:`to_frame` or
+    :meth:`to_records`.
+
+    The series also behaves like the list of per-bar dicts the services used
+    to return: ``len()``, truth testing, iteration and integer indexing yield
+    record dicts, and it compares equal to an equivalent list of records.
+    """
+
+    __slots__ = ('timestamps', 'open', 'high', 'low', 'close', 'volume', 'interval')
+    __hash__ = None
+
+    def __init__(
+        self,
+        timestamps: np.ndarray,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+        interval: str = '1-day',
+    ):
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+        self.interval = interval
+
+    @classmethod
+    def empty(cls, interval: str = '1-day') -> 'BarSeries':
+        return cls(*(np.empty(0) for _ in range(6)), interval=interval)
+
+    @classmethod
+    def from_aggs(cls, aggs: Optional[Iterable[Any]], interval: str = '1-day') -> 'BarSeries':
+        """Build a series from Polygon ``Agg`` objects (sorted ascending)."""
+        aggs = list(aggs or [])
+        count = len(aggs)
+
+        def column(name: str, dtype) -> np.ndarray:
+            return np.fromiter(
+                (np.nan if getattr(agg, name) is None else getattr(agg, name) for agg in aggs),
+                dtype=dtype, count=count,
+            )
+
+        return cls(
+            np.fromiter((agg.timestamp for agg in aggs), dtype=np.int64, count=count),
+            *(column(name, np.float64) for name in PRICE_COLUMNS),
+            interval=interval,
+        )
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, interval: str = '1-day') -> 'BarSeries':
+        """Rebuild daily bars from a :meth:`to_frame`/:meth:`to_records` table (``date`` + OHLCV)."""
+        if frame.empty:
+            return cls.empty(interval=interval)
+        dates = pd.to_datetime(frame['date']).dt.tz_localize(EASTERN_TZ)
+        return cls(
+            dates.astype('int64').to_numpy() // 1_000_000,
+            *(pd.to_numeric(frame[name], errors='coerce').to_numpy() for name in PRICE_COLUMNS),
+            interval=interval,
+        )
+
+    @property
+    def is_intraday(self) -> bool:
+        return self.interval.endswith(('minute', 'hour'))
+
+    def _take(self, index) -> 'BarSeries':
+        return BarSeries(
+            self.timestamps[index], self.open[index], self.high[index],
+            self.low[index], self.close[index], self.volume[index],
+            interval=self.interval,
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._take(index)
+        position = range(len(self))[index]
+        return self._take(slice(position, position + 1)).to_records()[0]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.to_records())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, BarSeries):
+            return self.interval == other.interval and all(
+                np.array_equal(getattr(self, name), getattr(other, name), equal_nan=True)
+                for name in ('timestamps',) + PRICE_COLUMNS
+            )
+        if isinstance(other, list):
+            return self.to_records() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"BarSeries(interval={self.interval!r}, bars={len(self)})"
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in ('timestamps',) + PRICE_COLUMNS)
+
+    @property
+    def last_date(self) -> Optional[str]:
+        if not len(self):
+            return None
+        return datetime.fromtimestamp(self.timestamps[-1] / 1000, tz=EASTERN_TZ).strftime('%Y-%m-%d')
+
+    def between(self, start_date: str, end_date: str) -> 'BarSeries':
+        """Return the bars whose Eastern trading date is within ``[start_date, end_date]``."""
+        lo = np.searchsorted(self.timestamps, date_to_epoch_ms(start_date), side='left')
+        hi = np.searchsorted(self.timestamps, date_to_epoch_ms(end_date, days=1), side='left')
+        return self._take(slice(lo, hi))
+
+    def within(self, bounds: np.ndarray) -> 'BarSeries':
+        """Keep bars inside any inclusive [open, close] interval of ``bounds``.
+
+        ``bounds`` is a sorted, non-overlapping ``(n, 2)`` epoch-ms array such as
+        :func:`app.utils.market_calendar.session_bounds` returns, so filtering
+        is two vector lookups.
+        """
+        if not len(self) or not len(bounds):
+            return self._take(slice(0, 0))
+        session = np.searchsorted(bounds[:, 0], self.timestamps, side='right') - 1
+        mask = (session >= 0) & (self.timestamps <= bounds[np.maximum(session, 0), 1])
+        return self._take(mask)
+
+    def merge(self, other: 'BarSeries') -> 'BarSeries':
+        """Return the union of both series; bars in ``other`` replace same-timestamp bars."""
+        if not len(other):
+            return self
+        keep = ~np.isin(self.timestamps, other.timestamps)
+        merged = BarSeries(
+            *(np.concatenate([getattr(self, name)[keep], getattr(other, name)])
+              for name in ('timestamps',) + PRICE_COLUMNS),
+            interval=other.interval,
+        )
+        return merged._take(np.argsort(merged.timestamps, kind='stable'))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return a DataFrame whose OHLCV columns share memory with this series."""
+        local = pd.to_datetime(self.timestamps, unit='ms', utc=True).tz_convert(EASTERN_TZ)
+        columns: Dict[str, Any] = {}
+        if self.is_intraday:
+            iso = pd.Index(local.strftime('%Y-%m-%dT%H:%M:%S%z'))
+            columns['datetime'] = iso.str[:-2] + ':' + iso.str[-2:]
+            columns['date'] = local.strftime('%Y-%m-%d')
+            columns['time'] = local.strftime('%H:%M')
+        else:
+            columns['date'] = local.strftime('%Y-%m-%d')
+        for name in PRICE_COLUMNS:
+            columns[name] = getattr(self, name)
+        frame = pd.DataFrame(columns, copy=False)
+        if self.is_intraday:
+            frame['resolution'] = 'intraday'
+            frame['interval'] = self.interval
+        return frame
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Return JSON-ready per-bar dicts (the services' historical list format).
+
+        Fields Polygon left out are stored as NaN and come back as None.
+        """
+        if not len(self):
+            return []
+        frame = self.to_frame()
+        if frame[list(PRICE_COLUMNS)].isna().to_numpy().any():
+            frame = frame.astype(object).where(frame.notna(), None)
+        return frame.to_dict('records')
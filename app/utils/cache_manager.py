@@ -1,6 +1,26 @@
-from typing import Any, Dict
+import logging
+import time
+import uuid
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from flask import current_app, has_app_context
 from flask_caching import Cache
 
+from .bars import BarSeries
+from .cache_monitor import metrics
+from .cache_serializer import ChunkManifest, get_serializer
+from .local_tier import LocalTier, estimate_size
+from .concurrency import submit_with_app_context
+from .market_calendar import (
+    is_market_open, latest_session_date, market_now, next_session_open, session_close,
+)
+from .rate_limiter import PRIORITY_PREFETCH, request_priority
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
 DEFAULT_TIMEOUTS: Dict[str, int] = {
     'price': 300,       # 5 minutes
     'details': 86400,   # 24 hours
@@ -9,12 +29,259 @@ DEFAULT_TIMEOUTS: Dict[str, int] = {
     'fallback': 600     # default/fallback timeout
 }
 
+# Data types whose values only change while the market is open. Their TTLs
+# above apply during a session; written outside one they stay valid until the
+# next open, and historical windows ending before the latest session are
+# complete and kept for IMMUTABLE_TIMEOUT. The price is the last completed
+# session's close, so during a session it stays fresh until that session closes.
+SESSION_AWARE_TYPES = ('price', 'historical', 'intraday')
+IMMUTABLE_TIMEOUT = 7 * 86400  # 7 days (bounded so split adjustments refresh)
+
+# Stale-while-revalidate window: for how many seconds past its fresh TTL an
+# entry is still served (while a background refresh runs) before callers
+# have to block on a fetch. Types not listed expire normally.
+DEFAULT_STALE_TIMEOUTS: Dict[str, int] = {
+    'price': 3600,      # 1 hour
+    'intraday': 1800,   # 30 minutes
+}
+
+# How long a failed lookup is remembered, by reason, so retries and refresh
+# cycles for unknown or failing symbols don't go upstream again.
+NEGATIVE_TIMEOUTS: Dict[str, int] = {
+    'not_found': 86400, # symbol does not exist upstream
+    'empty': 900,       # upstream answered with no data
+    'error': 60,        # transient failure (network, 5xx, rate limit)
+}
+
+# Serialized values larger than this are split across several keys.
+DEFAULT_MAX_VALUE_BYTES = 512 * 1024
+
+
+# Data types whose start_date/end_date windows are indexed per symbol so a
+# request inside an already cached window is answered by slicing it.
+RANGE_INDEXED_TYPES = ('historical',)
+MAX_INDEXED_RANGES = 16
+
+# Shared by every StockCache in the process so concurrent misses for the same
+# key trigger one upstream fetch.
+_inflight = SingleFlight()
+_refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='cache-refresh')
+
+
+def session_aware_timeout(
+    data_type: str, base_timeout: int, now: datetime, end_date: Optional[str] = None
+) -> int:
+    """Return the TTL for ``data_type`` written at ``now`` (US/Eastern)."""
+    if data_type not in SESSION_AWARE_TYPES:
+        return base_timeout
+    if data_type == 'historical' and end_date and end_date < latest_session_date(now).isoformat():
+        return IMMUTABLE_TIMEOUT
+    if is_market_open(now):
+        if data_type == 'price':
+            return max(base_timeout, int((session_close(now.date()) - now).total_seconds()))
+        return base_timeout
+    return max(base_timeout, int((next_session_open(now) - now).total_seconds()))
+
+
+class SymbolNotFound(Exception):
+    """Raised by fetchers when upstream reports that a symbol does not exist."""
+
+
+class CacheEntry(NamedTuple):
+    """Stored value of a stale-while-revalidate entry."""
+    value: Any
+    fresh_until: float
+
+
+def _is_cacheable(data: Any) -> bool:
+    return data is not None and not (isinstance(data, (list, BarSeries)) and not data)
+
+
+def slice_by_date(bars: Any, start_date: str, end_date: str) -> Any:
+    """Return the date-sorted bars dated within ``[start_date, end_date]``.
+
+    Accepts a :class:`BarSeries` or a list of per-bar dicts with a ``date`` key.
+    """
+    if isinstance(bars, BarSeries):
+        return bars.between(start_date, end_date)
+    dates = [bar['date'] for bar in bars]
+    return bars[bisect_left(dates, start_date):bisect_right(dates, end_date)]
+
+
+def _configured_options() -> Tuple[Any, int, Optional[LocalTier]]:
+    """Return the app's serializer, chunk size and local tier (if enabled)."""
+    if not has_app_context():
+        return get_serializer(None), DEFAULT_MAX_VALUE_BYTES, None
+    config = current_app.config
+    local = None
+    if config.get('CACHE_L1_MAX_ENTRIES'):
+        local = current_app.extensions.get('stock_cache_l1')
+        if local is None:
+            local = current_app.extensions.setdefault('stock_cache_l1', LocalTier(
+                max_entries=config['CACHE_L1_MAX_ENTRIES'],
+                max_bytes=config.get('CACHE_L1_MAX_BYTES', 64 * 1024 * 1024),
+                ttl=config.get('CACHE_L1_TTL', 5),
+            ))
+    return (
+        get_serializer(config.get('CACHE_SERIALIZER')),
+        config.get('CACHE_MAX_VALUE_BYTES', DEFAULT_MAX_VALUE_BYTES),
+        local,
+    )
+
+
+def _backend_name(cache: Any) -> str:
+    """Name of the storage class behind a Flask-Caching ``Cache`` (or a raw backend)."""
+    try:
+        backend = cache.cache if isinstance(cache, Cache) else cache
+    except RuntimeError:  # Flask-Caching outside an app context
+        backend = cache
+    return type(backend).__name__
+
+
+def _metric_type(key: str) -> str:
+    """Metrics label for a key: its data type, plus the kind of auxiliary key."""
+    parts = key.split(':')
+    if len(parts) < 3:
+        return 'other'
+    if parts[-1] in ('negative', 'ranges'):
+        return f"{parts[2]}:{parts[-1]}"
+    return parts[2]
+
+
 class StockCache:
-    """Simple wrapper around Flask-Caching for stock data."""
+    """Simple wrapper around Flask-Caching for stock data.
+
+    Values go through a serializer (``CACHE_SERIALIZER``, see
+    :mod:`app.utils.cache_serializer`); with a binary serializer, payloads over
+    ``CACHE_MAX_VALUE_BYTES`` are stored in chunks behind a manifest. A copy
+    of the manifest is kept under a small marker key, so a write only has to
+    read that marker to find the chunks it replaces.
+
+    With ``CACHE_L1_MAX_ENTRIES`` set, decoded values are also kept in a
+    per-process :class:`LocalTier`. Every write stores a version stamp next to
+    the value, which is how a worker notices that another one replaced it.
+    """
 
-    def __init__(self, cache: Cache, timeouts: Dict[str, int] | None = None):
+    def __init__(
+        self,
+        cache: Cache,
+        timeouts: Dict[str, int] | None = None,
+        stale_timeouts: Dict[str, int] | None = None,
+        serializer: Any = None,
+        max_value_bytes: Optional[int] = None,
+        local: Optional[LocalTier] = None,
+    ):
         self.cache = cache
         self.timeouts = timeouts or DEFAULT_TIMEOUTS
+        self.stale_timeouts = DEFAULT_STALE_TIMEOUTS if stale_timeouts is None else stale_timeouts
+        configured, configured_max, configured_local = _configured_options()
+        self.serializer = serializer or configured
+        self.max_value_bytes = max_value_bytes or configured_max
+        self.local = local if local is not None else configured_local
+        self.backend_name = _backend_name(cache)
+
+    @staticmethod
+    def _version_key(key: str) -> str:
+        return f"{key}:version"
+
+    @staticmethod
+    def _manifest_key(key: str) -> str:
+        return f"{key}:manifest"
+
+    def get_value(self, key: str) -> Any:
+        """Read and deserialize the value stored under ``key``."""
+        started = time.perf_counter()
+        value, backend, nbytes = self._read(key)
+        metrics.record_get(
+            _metric_type(key), backend, value is not None, time.perf_counter() - started, nbytes
+        )
+        return value
+
+    def set_value(self, key: str, value: Any, timeout: Optional[int] = None) -> None:
+        """Serialize ``value`` under ``key``, chunking it if it is too large."""
+        started = time.perf_counter()
+        nbytes = self._encode(key, value, timeout)
+        if self.local is not None:
+            version = uuid.uuid4().hex
+            self.cache.set(self._version_key(key), version, timeout=timeout)
+            self.local.put(key, value, version, ttl=min(self.local.ttl, timeout or self.local.ttl))
+        metrics.record_set(_metric_type(key), self.backend_name, time.perf_counter() - started, nbytes)
+
+    def delete_value(self, key: str) -> None:
+        if not self.serializer.passthrough:
+            previous = self.cache.get(self._manifest_key(key))
+            if isinstance(previous, ChunkManifest):
+                self.cache.delete_many(self._manifest_key(key), *self._chunk_keys(key, previous))
+        self.cache.delete(key)
+        if self.local is not None:
+            self.cache.delete(self._version_key(key))
+            self.local.discard(key)
+
+    def _read(self, key: str) -> Tuple[Any, str, int]:
+        """Return ``(value, backend that answered, bytes read)``."""
+        if self.local is None:
+            value, nbytes = self._decode(key, self.cache.get(key))
+            return value, self.backend_name, nbytes
+
+        entry = self.local.get(key)
+        if entry is not None:
+            if time.monotonic() < entry.expires_at:
+                return entry.value, 'l1', entry.size
+            if self.cache.get(self._version_key(key)) == entry.version:
+                self.local.renew(key, entry)
+                return entry.value, 'l1', entry.size
+
+        raw, version = self.cache.get_many(key, self._version_key(key))
+        value, nbytes = self._decode(key, raw)
+        if value is None or version is None:
+            self.local.discard(key)
+        else:
+            self.local.put(key, value, version)
+        return value, self.backend_name, nbytes
+
+    def _decode(self, key: str, raw: Any) -> Tuple[Any, int]:
+        """Return the decoded value and its stored size in bytes."""
+        if raw is None:
+            return None, 0
+        if self.serializer.passthrough:
+            return raw, estimate_size(raw)
+        if isinstance(raw, ChunkManifest):
+            parts = self.cache.get_many(*self._chunk_keys(key, raw))
+            if any(part is None for part in parts):
+                return None, 0  # a chunk was evicted; treat as a miss
+            raw = b''.join(parts)
+        try:
+            return self.serializer.loads(raw), len(raw) if isinstance(raw, bytes) else 0
+        except Exception as e:
+            logger.warning(f"Discarding undecodable cache value {key}: {str(e)}")
+            return None, 0
+
+    def _encode(self, key: str, value: Any, timeout: Optional[int]) -> int:
+        """Write ``value`` to the backend and return its stored size in bytes."""
+        if self.serializer.passthrough:
+            self.cache.set(key, value, timeout=timeout)
+            return estimate_size(value)
+        data = self.serializer.dumps(value)
+        previous = self.cache.get(self._manifest_key(key))  # only set while the value is chunked
+        if len(data) > self.max_value_bytes:
+            manifest = ChunkManifest(uuid.uuid4().hex[:12], -(-len(data) // self.max_value_bytes))
+            step = self.max_value_bytes
+            self.cache.set_many({
+                chunk_key: data[i * step:(i + 1) * step]
+                for i, chunk_key in enumerate(self._chunk_keys(key, manifest))
+            }, timeout=timeout)
+            self.cache.set_many({key: manifest, self._manifest_key(key): manifest}, timeout=timeout)
+        else:
+            self.cache.set(key, data, timeout=timeout)
+            if previous is not None:
+                self.cache.delete(self._manifest_key(key))
+        if isinstance(previous, ChunkManifest):
+            self.cache.delete_many(*self._chunk_keys(key, previous))
+        return len(data)
+
+    @staticmethod
+    def _chunk_keys(key: str, manifest: ChunkManifest) -> List[str]:
+        return [f"{key}:chunk:{manifest.token}:{i}" for i in range(manifest.count)]
 
     def _get_cache_key(self, symbol: str, data_type: str, **kwargs: Any) -> str:
         key_parts = [f"stock:{symbol}:{data_type}"]
@@ -23,11 +290,210 @@ class StockCache:
                 key_parts.append(f"{k}={v}")
         return ":".join(key_parts)
 
+    def _get_negative_key(self, symbol: str, data_type: str, **kwargs: Any) -> str:
+        return f"{self._get_cache_key(symbol, data_type, **kwargs)}:negative"
+
+    def _get_range_index_key(self, symbol: str, data_type: str) -> str:
+        return f"stock:{symbol}:{data_type}:ranges"
+
+    def _get_timeout(self, data_type: str, end_date: Optional[str] = None) -> int:
+        base_timeout = self.timeouts.get(data_type, self.timeouts.get('fallback', 300))
+        return session_aware_timeout(data_type, base_timeout, market_now(), end_date=end_date)
+
+    def _is_range_request(self, data_type: str, kwargs: Dict[str, Any]) -> bool:
+        return data_type in RANGE_INDEXED_TYPES and set(kwargs) == {'start_date', 'end_date'}
+
     def get_cached_data(self, symbol: str, data_type: str, **kwargs: Any) -> Any:
+        if self._is_range_request(data_type, kwargs):
+            return self._get_cached_range(symbol, data_type, kwargs['start_date'], kwargs['end_date'])
         key = self._get_cache_key(symbol, data_type, **kwargs)
-        return self.cache.get(key)
+        value = self.get_value(key)
+        return value.value if isinstance(value, CacheEntry) else value
 
     def set_cached_data(self, symbol: str, data_type: str, data: Any, **kwargs: Any) -> None:
+        if self._is_range_request(data_type, kwargs):
+            self._set_cached_range(symbol, data_type, data, kwargs['start_date'], kwargs['end_date'])
+            return
+        key = self._get_cache_key(symbol, data_type, **kwargs)
+        self.set_value(key, data, timeout=self._get_timeout(data_type))
+
+    def get_negative(self, symbol: str, data_type: str, **kwargs: Any) -> Optional[str]:
+        """Return the reason a recent lookup failed, or None."""
+        return self.get_value(self._get_negative_key(symbol, data_type, **kwargs))
+
+    def set_negative(self, symbol: str, data_type: str, reason: str, **kwargs: Any) -> None:
+        timeout = NEGATIVE_TIMEOUTS.get(reason, NEGATIVE_TIMEOUTS['error'])
+        self.set_value(self._get_negative_key(symbol, data_type, **kwargs), reason, timeout=timeout)
+
+    def get_or_fetch(
+        self, symbol: str, data_type: str, fetcher: Callable[[], Any], **kwargs: Any
+    ) -> Any:
+        """Return cached data, or fetch it once for all concurrent callers.
+
+        Callers that miss while another thread is already fetching the same key
+        wait for that fetch instead of issuing their own. Exceptions raised by
+        ``fetcher`` propagate to every waiting caller.
+
+        Failed lookups are negatively cached for ``NEGATIVE_TIMEOUTS[reason]``:
+        ``SymbolNotFound`` as ``not_found``, other exceptions as ``error`` and
+        ``None`` or empty results as ``empty``. Until that expires, misses
+        return ``None`` without calling ``fetcher``.
+
+        Data types with a stale timeout are stale-while-revalidate: once an
+        entry is past its fresh TTL it is still returned immediately and a
+        background refresh is started; only after the stale window ends does
+        a caller block on ``fetcher``.
+        """
+        swr = self._is_swr(data_type, kwargs)
         key = self._get_cache_key(symbol, data_type, **kwargs)
-        timeout = self.timeouts.get(data_type, self.timeouts.get('fallback', 300))
-        self.cache.set(key, data, timeout=timeout)
+        if swr:
+            entry = self.get_value(key)
+            if isinstance(entry, CacheEntry):
+                if time.time() >= entry.fresh_until:
+                    self._refresh_in_background(key, symbol, data_type, fetcher)
+                return entry.value
+            if entry is not None:
+                return entry
+        else:
+            cached = self.get_cached_data(symbol, data_type, **kwargs)
+            if cached is not None:
+                return cached
+
+        reason = self.get_negative(symbol, data_type, **kwargs)
+        if reason is not None:
+            metrics.record_negative_hit(data_type, reason)
+            logger.debug(f"Negative cache hit for {key} ({reason})")
+            return None
+
+        def load() -> Any:
+            # Another leader may have filled the cache since our miss.
+            cached = self.get_cached_data(symbol, data_type, **kwargs)
+            if cached is not None:
+                return cached
+            return self._fetch_and_store(symbol, data_type, fetcher, **kwargs)
+
+        return _inflight.do(key, load)
+
+    def _is_swr(self, data_type: str, kwargs: Dict[str, Any]) -> bool:
+        return data_type in self.stale_timeouts and not self._is_range_request(data_type, kwargs)
+
+    def _fetch_and_store(
+        self, symbol: str, data_type: str, fetcher: Callable[[], Any], **kwargs: Any
+    ) -> Any:
+        try:
+            data = fetcher()
+        except SymbolNotFound:
+            self.set_negative(symbol, data_type, 'not_found', **kwargs)
+            raise
+        except Exception:
+            self.set_negative(symbol, data_type, 'error', **kwargs)
+            raise
+        if not _is_cacheable(data):
+            self.set_negative(symbol, data_type, 'empty', **kwargs)
+            return data
+        self.store_fetched(symbol, data_type, data, **kwargs)
+        return data
+
+    def store_fetched(self, symbol: str, data_type: str, data: Any, **kwargs: Any) -> None:
+        """Cache freshly fetched ``data`` the way :meth:`get_or_fetch` does.
+
+        Stale-while-revalidate types are stored as a :class:`CacheEntry`, so
+        values fetched elsewhere (e.g. in bulk) are refreshed in the background
+        like any other instead of expiring hard.
+        """
+        if self._is_swr(data_type, kwargs):
+            fresh_for = self._get_timeout(data_type)
+            self.set_value(
+                self._get_cache_key(symbol, data_type, **kwargs),
+                CacheEntry(data, time.time() + fresh_for),
+                timeout=fresh_for + self.stale_timeouts[data_type],
+            )
+        else:
+            self.set_cached_data(symbol, data_type, data, **kwargs)
+
+    def _refresh_in_background(
+        self, key: str, symbol: str, data_type: str, fetcher: Callable[[], Any]
+    ) -> None:
+        """Re-fetch a stale entry off the request path (once per key at a time).
+
+        Skipped while a failed refresh is negatively cached, so a stale entry
+        whose refreshes keep failing does not spend a request on every read.
+        """
+        if _inflight.in_flight(key):
+            return
+        reason = self.get_negative(symbol, data_type)
+        if reason is not None:
+            metrics.record_negative_hit(data_type, reason)
+            return
+
+        def refresh() -> None:
+            try:
+                with request_priority(PRIORITY_PREFETCH):
+                    _inflight.do(key, lambda: self._fetch_and_store(symbol, data_type, fetcher))
+            except Exception as e:
+                logger.warning(f"Background refresh of {key} failed: {str(e)}")
+
+        if has_app_context():
+            submit_with_app_context(_refresh_executor, refresh)
+        else:
+            _refresh_executor.submit(refresh)
+
+    def _get_cached_range(self, symbol: str, data_type: str, start_date: str, end_date: str) -> Optional[Any]:
+        """Answer a window from any cached window that contains it.
+
+        A listed window whose value has expired is dropped from the index here,
+        when its read misses, so the lookup costs no extra round trips.
+        """
+        index_key = self._get_range_index_key(symbol, data_type)
+        index = self.get_value(index_key) or []
+        expired = []
+        found = None
+        for cached_start, cached_end in index:
+            if not (cached_start <= start_date and end_date <= cached_end):
+                continue
+            data = self.get_value(self._get_cache_key(
+                symbol, data_type, start_date=cached_start, end_date=cached_end
+            ))
+            if data is None:
+                expired.append((cached_start, cached_end))
+                continue
+            if (cached_start, cached_end) == (start_date, end_date):
+                found = data
+            else:
+                found = slice_by_date(data, start_date, end_date)
+            break
+        if expired:
+            self.set_value(index_key, [w for w in index if w not in expired], timeout=IMMUTABLE_TIMEOUT)
+        return found
+
+    def _set_cached_range(self, symbol: str, data_type: str, data: Any, start_date: str, end_date: str) -> None:
+        """Store a window unless a cached window already covers it.
+
+        Cached windows that the new one covers are dropped, so overlapping
+        requests never store the same bars twice.
+        """
+        index_key = self._get_range_index_key(symbol, data_type)
+        # Writes are rare, so expired windows are pruned here rather than on reads.
+        index = [
+            (s, e) for s, e in self.get_value(index_key) or []
+            if self.cache.has(self._get_cache_key(symbol, data_type, start_date=s, end_date=e))
+        ]
+        if any(s <= start_date and end_date <= e for s, e in index):
+            return
+
+        kept = []
+        for cached_start, cached_end in index:
+            if start_date <= cached_start and cached_end <= end_date:
+                self.delete_value(self._get_cache_key(
+                    symbol, data_type, start_date=cached_start, end_date=cached_end
+                ))
+            else:
+                kept.append((cached_start, cached_end))
+        kept.append((start_date, end_date))
+
+        timeout = self._get_timeout(data_type, end_date=end_date)
+        key = self._get_cache_key(symbol, data_type, start_date=start_date, end_date=end_date)
+        self.set_value(key, data, timeout=timeout)
+        # The index outlives any window it lists; expired windows are pruned on
+        # a missed read or the next write.
+        self.set_value(index_key, kept[-MAX_INDEXED_RANGES:], timeout=IMMUTABLE_TIMEOUT)
@@ -1,16 +1,170 @@
 from __future__ import annotations
 
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from typing import Callable, Dict, List, Tuple
+
 from flask import current_app
-from .cache_manager import StockCache
-from app.extensions import cache
 
+# Upper bounds (seconds) of the get/set latency histogram buckets.
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+Labels = Tuple[str, str]  # (data_type, backend)
+
+
+class _Histogram:
+    __slots__ = ('buckets', 'total', 'count')
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+
+class CacheMetrics:
+    """Per-process cache counters and latency histograms.
+
+    Series are labelled by data type (the ``stock:<symbol>:<type>`` key part,
+    with ``:negative``/``:ranges`` for auxiliary keys) and by backend (``l1``
+    for the in-process tier, otherwise the backend class name). With several
+    workers, each exposes its own counters; Prometheus sums them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.hits: Counter = Counter()
+            self.misses: Counter = Counter()
+            self.sets: Counter = Counter()
+            self.read_bytes: Counter = Counter()
+            self.written_bytes: Counter = Counter()
+            self.negative_hits: Counter = Counter()
+            self.evictions: Counter = Counter()
+            self.get_latency: Dict[Labels, _Histogram] = {}
+            self.set_latency: Dict[Labels, _Histogram] = {}
+
+    def record_get(self, data_type: str, backend: str, hit: bool, seconds: float, nbytes: int = 0) -> None:
+        labels = (data_type, backend)
+        with self._lock:
+            (self.hits if hit else self.misses)[labels] += 1
+            self.read_bytes[labels] += nbytes
+            self.get_latency.setdefault(labels, _Histogram()).observe(seconds)
+
+    def record_set(self, data_type: str, backend: str, seconds: float, nbytes: int = 0) -> None:
+        labels = (data_type, backend)
+        with self._lock:
+            self.sets[labels] += 1
+            self.written_bytes[labels] += nbytes
+            self.set_latency.setdefault(labels, _Histogram()).observe(seconds)
+
+    def record_negative_hit(self, data_type: str, reason: str) -> None:
+        with self._lock:
+            self.negative_hits[(data_type, reason)] += 1
+
+    def record_eviction(self, backend: str, reason: str) -> None:
+        with self._lock:
+            self.evictions[(backend, reason)] += 1
+
+    def render(self) -> str:
+        """Return all series in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name, help_text, counter in (
+                ('stock_cache_hits_total', 'Cache reads that found a value.', self.hits),
+                ('stock_cache_misses_total', 'Cache reads that found nothing.', self.misses),
+                ('stock_cache_sets_total', 'Cache writes.', self.sets),
+                ('stock_cache_read_bytes_total', 'Bytes returned by cache hits.', self.read_bytes),
+                ('stock_cache_written_bytes_total', 'Bytes written to the cache.', self.written_bytes),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                lines += [f"{name}{_labels(data_type=t, backend=b)} {v}" for (t, b), v in sorted(counter.items())]
+
+            name = 'stock_cache_negative_hits_total'
+            lines += [f"# HELP {name} Lookups answered by the negative cache.", f"# TYPE {name} counter"]
+            lines += [f"{name}{_labels(data_type=t, reason=r)} {v}"
+                      for (t, r), v in sorted(self.negative_hits.items())]
+
+            name = 'stock_cache_evictions_total'
+            lines += [f"# HELP {name} Entries evicted by a size-bounded backend.", f"# TYPE {name} counter"]
+            lines += [f"{name}{_labels(backend=b, reason=r)} {v}"
+                      for (b, r), v in sorted(self.evictions.items())]
+
+            for name, help_text, histograms in (
+                ('stock_cache_get_duration_seconds', 'Cache read latency.', self.get_latency),
+                ('stock_cache_set_duration_seconds', 'Cache write latency.', self.set_latency),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for (data_type, backend), histogram in sorted(histograms.items()):
+                    cumulative = 0
+                    for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), histogram.buckets):
+                        cumulative += count
+                        le = bound if bound == '+Inf' else repr(bound)
+                        lines.append(f"{name}_bucket{_labels(data_type=data_type, backend=backend, le=le)} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(data_type=data_type, backend=backend)} {histogram.total}")
+                    lines.append(f"{name}_count{_labels(data_type=data_type, backend=backend)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels: str) -> str:
+    def escape(value: str) -> str:
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels.items()) + "}"
+
+
+metrics = CacheMetrics()
+
+# Other components' series appended to /metrics, by name.
+_collectors: Dict[str, Callable[[], List[str]]] = {}
+
+
+def register_collector(name: str, collector: Callable[[], List[str]]) -> None:
+    """Append the Prometheus lines returned by ``collector`` to ``render_metrics``."""
+    _collectors[name] = collector
+
+
+def render_metrics() -> str:
+    extra = [line for collector in _collectors.values() for line in collector()]
+    return metrics.render() + ("\n".join(extra) + "\n" if extra else "")
+
+
+def get_negative_cache_hits() -> Dict[Tuple[str, str], int]:
+    """Return negative-cache hit counts keyed by (data_type, reason)."""
+    return dict(metrics.negative_hits)
+
+
+def get_hit_rates() -> Dict[Labels, Tuple[int, int]]:
+    """Return (hits, misses) per (data_type, backend)."""
+    labels = set(metrics.hits) | set(metrics.misses)
+    return {label: (metrics.hits[label], metrics.misses[label]) for label in sorted(labels)}
+
+
+def test_cache_functionality(symbol: str) -> bool:
+    """Round-trip a value through the configured cache for the ``test-cache`` CLI command.
+
+    Uses a scratch key, never a real data key, so the check cannot leave a
+    bogus value where a price or history is expected.
+    """
+    from app.extensions import cache
+    from .cache_manager import StockCache
 
-def test_cache_functionality(symbol: str) -> None:
-    """Simple cache test utility used by CLI command."""
     stock_cache = StockCache(cache)
-    # This is a placeholder demonstrating cache usage.
-    if stock_cache.get_cached_data(symbol, "price") is None:
-        stock_cache.set_cached_data(symbol, "price", {"tested": True})
-        current_app.logger.info("Cached test data for %s", symbol)
+    key = f"cache-test:{symbol}"
+    probe = {'symbol': symbol, 'written_at': time.time()}
+    stock_cache.set_value(key, probe, timeout=60)
+    ok = stock_cache.get_value(key) == probe
+    stock_cache.delete_value(key)
+    if ok:
+        current_app.logger.info("Cache round trip succeeded for %s", symbol)
     else:
-        current_app.logger.info("Cache hit for %s", symbol)
+        current_app.logger.warning("Cache round trip failed for %s", symbol)
+    return ok
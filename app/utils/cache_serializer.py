@@ -0,0 +1,149 @@
+import io
+import pickle
+import struct
+import zlib
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .bars import PRICE_COLUMNS, BarSeries
+
+try:  # a dependency; guarded so an install without it still falls back to zlib
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+try:  # optional
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - depends on the environment
+    lz4_frame = None
+
+MAGIC = b'SC1'
+COMPRESS_MIN_BYTES = 1024  # smaller payloads are stored uncompressed
+
+CODEC_NONE, CODEC_ZLIB, CODEC_ZSTD, CODEC_LZ4 = 0, 1, 2, 3
+
+
+def _codecs() -> Dict[int, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]]:
+    codecs = {
+        CODEC_NONE: (bytes, bytes),
+        CODEC_ZLIB: (lambda data: zlib.compress(data, 6), zlib.decompress),
+    }
+    if zstandard is not None:
+        codecs[CODEC_ZSTD] = (
+            zstandard.ZstdCompressor(level=3).compress,
+            lambda data: zstandard.ZstdDecompressor().decompress(data),
+        )
+    if lz4_frame is not None:
+        codecs[CODEC_LZ4] = (lz4_frame.compress, lz4_frame.decompress)
+    return codecs
+
+
+CODECS = _codecs()
+PREFERRED_CODEC = next(c for c in (CODEC_ZSTD, CODEC_LZ4, CODEC_ZLIB) if c in CODECS)
+
+
+class ChunkManifest(NamedTuple):
+    """Stored under a key whose serialized value was split into ``count`` chunks."""
+    token: str
+    count: int
+
+
+def _shuffle(column: np.ndarray) -> bytes:
+    # Group the n-th byte of every value together; compresses far better.
+    return np.ascontiguousarray(column).view(np.uint8).reshape(-1, 8).T.tobytes()
+
+
+def _unshuffle(data: memoryview, count: int, dtype) -> np.ndarray:
+    return np.frombuffer(data, dtype=np.uint8).reshape(8, count).T.copy().view(dtype).ravel()
+
+
+def pack_bars(bars: BarSeries) -> bytes:
+    """Pack a series as delta-encoded timestamps plus byte-shuffled float columns."""
+    interval = bars.interval.encode()
+    deltas = np.diff(bars.timestamps, prepend=np.int64(0))
+    parts = [struct.pack('<IH', len(bars), len(interval)), interval, _shuffle(deltas)]
+    parts.extend(_shuffle(getattr(bars, name)) for name in PRICE_COLUMNS)
+    return b''.join(parts)
+
+
+def unpack_bars(data: bytes) -> BarSeries:
+    count, interval_len = struct.unpack_from('<IH', data)
+    offset = struct.calcsize('<IH')
+    interval = bytes(data[offset:offset + interval_len]).decode()
+    offset += interval_len
+    view, width = memoryview(data), count * 8
+    columns = []
+    for dtype in (np.int64,) + (np.float64,) * len(PRICE_COLUMNS):
+        columns.append(_unshuffle(view[offset:offset + width], count, dtype))
+        offset += width
+    columns[0] = np.cumsum(columns[0])
+    return BarSeries(*columns, interval=interval)
+
+
+class _Pickler(pickle.Pickler):
+    def persistent_id(self, obj: Any) -> Optional[bytes]:
+        return pack_bars(obj) if isinstance(obj, BarSeries) else None
+
+
+class _Unpickler(pickle.Unpickler):
+    def persistent_load(self, pid: bytes) -> BarSeries:
+        return unpack_bars(pid)
+
+
+class PickleSerializer:
+    """Leave values to the backend's own serialization (the default)."""
+
+    name = 'pickle'
+    passthrough = True
+
+    def dumps(self, value: Any) -> Any:
+        return value
+
+    def loads(self, data: Any) -> Any:
+        return data
+
+
+class PackedSerializer:
+    """Compact binary cache values.
+
+    Containers are pickled, but every :class:`BarSeries` inside them is
+    written as packed column arrays, and payloads over ``COMPRESS_MIN_BYTES``
+    are compressed with zstd (or lz4, or zlib where zstd is missing). A
+    three-byte magic plus a codec id prefix the payload, so any reader can
+    decode it and values written before the serializer was enabled are
+    returned unchanged.
+    """
+
+    name = 'packed'
+    passthrough = False
+
+    def __init__(self, codec: int = PREFERRED_CODEC):
+        self.codec = codec
+
+    def dumps(self, value: Any) -> bytes:
+        buffer = io.BytesIO()
+        _Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(value)
+        body = buffer.getvalue()
+        codec = self.codec if len(body) >= COMPRESS_MIN_BYTES else CODEC_NONE
+        return MAGIC + bytes([codec]) + CODECS[codec][0](body)
+
+    def loads(self, data: Any) -> Any:
+        if not isinstance(data, bytes) or not data.startswith(MAGIC):
+            return data
+        codec = data[len(MAGIC)]
+        if codec not in CODECS:
+            raise ValueError(f"Cache value compressed with unavailable codec {codec}")
+        body = CODECS[codec][1](data[len(MAGIC) + 1:])
+        return _Unpickler(io.BytesIO(body)).load()
+
+
+SERIALIZERS = {cls.name: cls for cls in (PickleSerializer, PackedSerializer)}
+
+
+def get_serializer(name: Optional[str]):
+    """Return a serializer instance for a ``CACHE_SERIALIZER`` setting."""
+    try:
+        return SERIALIZERS[name or 'pickle']()
+    except KeyError:
+        raise ValueError(f"Unknown cache serializer: {name}")
@@ -0,0 +1,22 @@
+import contextvars
+from concurrent.futures import Executor, Future
+from typing import Any, Callable
+
+from flask import current_app
+
+
+def submit_with_app_context(executor: Executor, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """Submit ``fn`` to ``executor`` inside the caller's app context.
+
+    Worker threads do not inherit the Flask app context (needed for the cache
+    and database) or context variables such as the Polygon request priority,
+    so both are carried over explicitly.
+    """
+    app = current_app._get_current_object()
+    context = contextvars.copy_context()
+
+    def run() -> Any:
+        with app.app_context():
+            return fn(*args, **kwargs)
+
+    return executor.submit(context.run, run)
@@ -0,0 +1,50 @@
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of ``threshold`` points chosen by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. The points in between are
+    split into ``threshold - 2`` equal buckets, and from each bucket the point
+    forming the largest triangle with the previously kept point and the next
+    bucket's mean is kept, which preserves peaks, troughs and the line's
+    overall shape. Returns all indices when ``threshold`` is not smaller than
+    the number of points.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    counts = np.diff(edges)
+    mean_x = np.append(np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / counts, x[-1])
+    mean_y = np.append(np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / counts, y[-1])
+
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nx, ny = mean_x[i + 1], mean_y[i + 1]
+        area = np.abs((x[a] - nx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (ny - y[a]))
+        a = lo + (int(np.nanargmax(area)) if not np.isnan(area).all() else 0)
+        indices[i + 1] = a
+    return indices
+
+
+def minmax_indices(y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the minimum and maximum of each of ``threshold // 2`` equal buckets.
+
+    Suited to bars (e.g. volume), where spikes must survive and the trend
+    between points does not matter. Returns sorted, unique indices.
+    """
+    n = len(y)
+    buckets = threshold // 2
+    if threshold >= n or buckets < 1:
+        return np.arange(n)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    bucket = np.repeat(np.arange(buckets), np.diff(edges))
+    order = np.lexsort((np.asarray(y, dtype=np.float64), bucket))   # by bucket, then value
+    return np.unique(np.concatenate([order[edges[:-1]], order[edges[1:] - 1]]))
@@ -0,0 +1,94 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, NamedTuple, Optional
+
+from .bars import BarSeries
+
+
+def estimate_size(value: Any) -> int:
+    """Rough in-memory size of a cached value, in bytes."""
+    if isinstance(value, BarSeries):
+        return value.nbytes + 200
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    return sys.getsizeof(value)
+
+
+class LocalEntry(NamedTuple):
+    value: Any
+    version: str
+    size: int
+    expires_at: float
+
+
+class LocalTier:
+    """In-process LRU of decoded values in front of the shared cache backend.
+
+    Bounded by entry count and total (estimated) bytes. An entry is served
+    without touching the backend for ``ttl`` seconds; after that it is
+    revalidated by comparing its version stamp with the one stored in the
+    backend, so only a small key crosses the network unless another worker
+    has written a new value.
+    """
+
+    def __init__(self, max_entries: int = 2048, max_bytes: int = 64 * 1024 * 1024, ttl: float = 5.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: 'OrderedDict[str, LocalEntry]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> Optional[LocalEntry]:
+        """Return the entry for ``key`` (possibly past its TTL) and mark it recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, value: Any, version: str, ttl: Optional[float] = None) -> None:
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            self.discard(key)
+            return
+        entry = LocalEntry(value, version, size, time.monotonic() + (self.ttl if ttl is None else ttl))
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = entry
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+
+    def renew(self, key: str, entry: LocalEntry) -> None:
+        """Extend a revalidated entry's TTL."""
+        with self._lock:
+            if self._entries.get(key) is entry:
+                self._entries[key] = entry._replace(expires_at=time.monotonic() + self.ttl)
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
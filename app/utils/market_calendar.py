@@ -0,0 +1,187 @@
+from datetime import date, datetime, time, timedelta
+from typing import Dict, FrozenSet, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+EASTERN_TZ = ZoneInfo("America/New_York")
+MARKET_OPEN_ET = time(9, 30)
+MARKET_CLOSE_ET = time(16, 0)
+EARLY_CLOSE_ET = time(13, 0)
+
+# Years the NYSE calendar is precomputed for; outside it only weekends are closed.
+CALENDAR_YEARS = range(1990, 2051)
+
+# One-off closures that no rule produces.
+SPECIAL_CLOSURES = frozenset({
+    date(1994, 4, 27),   # President Nixon funeral
+    date(2001, 9, 11), date(2001, 9, 12), date(2001, 9, 13), date(2001, 9, 14),
+    date(2004, 6, 11),   # President Reagan funeral
+    date(2007, 1, 2),    # President Ford funeral
+    date(2012, 10, 29), date(2012, 10, 30),  # Hurricane Sandy
+    date(2018, 12, 5),   # President G.H.W. Bush funeral
+    date(2025, 1, 9),    # President Carter funeral
+})
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """Return the ``n``-th ``weekday`` of a month (``n=-1`` for the last one)."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    """Western Easter Sunday (anonymous Gregorian algorithm)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l) // 433
+    month, day = divmod(h + l - 7 * m + 90, 25)
+    return date(year, month, (h + l - 7 * m + 33 * month + 19) % 32)
+
+
+def _observed(day: date) -> date:
+    """Saturday holidays are observed on Friday, Sunday holidays on Monday."""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def _nyse_calendar(years: range) -> Tuple[FrozenSet[date], Dict[date, time]]:
+    holidays = set(SPECIAL_CLOSURES)
+    early_closes: Dict[date, time] = {}
+    for year in years:
+        new_year = date(year, 1, 1)
+        if new_year.weekday() != 5:  # no Friday observance across the year end
+            holidays.add(_observed(new_year))
+        if year >= 1998:
+            holidays.add(_nth_weekday(year, 1, 0, 3))  # Martin Luther King Jr. Day
+        holidays.add(_nth_weekday(year, 2, 0, 3))      # Washington's Birthday
+        holidays.add(_easter(year) - timedelta(days=2))  # Good Friday
+        holidays.add(_nth_weekday(year, 5, 0, -1))     # Memorial Day
+        if year >= 2022:
+            holidays.add(_observed(date(year, 6, 19)))  # Juneteenth
+        holidays.add(_observed(date(year, 7, 4)))      # Independence Day
+        holidays.add(_nth_weekday(year, 9, 0, 1))      # Labor Day
+        thanksgiving = _nth_weekday(year, 11, 3, 4)
+        holidays.add(thanksgiving)
+        holidays.add(_observed(date(year, 12, 25)))    # Christmas
+
+        early_closes[date(year, 7, 3)] = EARLY_CLOSE_ET
+        early_closes[thanksgiving + timedelta(days=1)] = EARLY_CLOSE_ET
+        early_closes[date(year, 12, 24)] = EARLY_CLOSE_ET
+
+    early_closes = {
+        day: close for day, close in early_closes.items()
+        if day.weekday() < 5 and day not in holidays
+    }
+    return frozenset(holidays), early_closes
+
+
+HOLIDAYS, EARLY_CLOSES = _nyse_calendar(CALENDAR_YEARS)
+
+
+def market_now() -> datetime:
+    """Return the current time in US/Eastern."""
+    return datetime.now(EASTERN_TZ)
+
+
+def _as_eastern(now: Optional[datetime]) -> datetime:
+    if now is None:
+        return market_now()
+    if now.tzinfo is None:
+        return now.replace(tzinfo=EASTERN_TZ)
+    return now.astimezone(EASTERN_TZ)
+
+
+def is_trading_day(day: date) -> bool:
+    return day.weekday() < 5 and day not in HOLIDAYS
+
+
+def previous_trading_day(day: date) -> date:
+    """Return the last trading day strictly before ``day``."""
+    day -= timedelta(days=1)
+    while not is_trading_day(day):
+        day -= timedelta(days=1)
+    return day
+
+
+def next_trading_day(day: date) -> date:
+    """Return the first trading day strictly after ``day``."""
+    day += timedelta(days=1)
+    while not is_trading_day(day):
+        day += timedelta(days=1)
+    return day
+
+
+def session_open(day: date) -> datetime:
+    return datetime.combine(day, MARKET_OPEN_ET, EASTERN_TZ)
+
+
+def session_close(day: date) -> datetime:
+    return datetime.combine(day, EARLY_CLOSES.get(day, MARKET_CLOSE_ET), EASTERN_TZ)
+
+
+def session_bounds(start_date: str, end_date: str) -> np.ndarray:
+    """Return an ``(n, 2)`` int64 array of [open, close] epoch ms per session in range."""
+    day = datetime.strptime(start_date, '%Y-%m-%d').date()
+    last = datetime.strptime(end_date, '%Y-%m-%d').date()
+    bounds = []
+    while day <= last:
+        if is_trading_day(day):
+            bounds.append([
+                int(session_open(day).timestamp() * 1000),
+                int(session_close(day).timestamp() * 1000),
+            ])
+        day += timedelta(days=1)
+    return np.array(bounds, dtype=np.int64).reshape(-1, 2)
+
+
+def most_recent_completed_session(now: Optional[datetime] = None) -> date:
+    """Return the latest trading day whose session has closed."""
+    now = _as_eastern(now)
+    today = now.date()
+    if is_trading_day(today) and now >= session_close(today):
+        return today
+    return previous_trading_day(today)
+
+
+def is_market_open(now: Optional[datetime] = None) -> bool:
+    """Return True during a regular trading session."""
+    now = _as_eastern(now)
+    today = now.date()
+    return is_trading_day(today) and session_open(today) <= now < session_close(today)
+
+
+def latest_session_date(now: Optional[datetime] = None) -> date:
+    """Return the most recent trading day whose session has already opened."""
+    now = _as_eastern(now)
+    today = now.date()
+    if is_trading_day(today) and now >= session_open(today):
+        return today
+    return previous_trading_day(today)
+
+
+def next_session_open(now: Optional[datetime] = None) -> datetime:
+    """Return the first session open strictly after ``now``."""
+    now = _as_eastern(now)
+    today = now.date()
+    if is_trading_day(today) and now < session_open(today):
+        return session_open(today)
+    return session_open(next_trading_day(today))
+
+
+def last_market_change(now: Optional[datetime] = None) -> datetime:
+    """Return the latest session open or close at or before ``now``."""
+    now = _as_eastern(now)
+    day = latest_session_date(now)
+    close = session_close(day)
+    return close if now >= close else session_open(day)
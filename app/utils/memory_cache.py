@@ -0,0 +1,201 @@
+import logging
+import os
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional
+
+from flask_caching.backends.base import BaseCache
+
+from .cache_monitor import metrics
+
+logger = logging.getLogger(__name__)
+
+# Eviction weight by data type: an entry survives roughly ``weight`` times as
+# many accesses as a weight-1 entry. Values that are expensive to refetch
+# (the 10-year bar store, company details) are weighted up.
+DEFAULT_TYPE_WEIGHTS: Dict[str, float] = {
+    'bars': 4.0,
+    'details': 4.0,
+    'historical': 2.0,
+    'intraday': 1.0,
+    'price': 1.0,
+}
+
+EVICTION_SAMPLE = 16       # least recently used entries considered per eviction
+RSS_CHECK_INTERVAL = 1.0   # seconds between /proc reads
+RSS_RECOVERY_RATIO = 0.9   # RSS must fall below this share of the watermark to lift the cut
+
+_TYPE_PATTERN = re.compile(r'stock:[^:]+:([^:]+)')
+
+
+def read_rss_bytes() -> Optional[int]:
+    """Return this process's resident set size, or None where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE')
+
+
+class _Entry(NamedTuple):
+    data: bytes
+    expires: float
+    weight: float
+    hits: int
+
+
+class BoundedMemoryCache(BaseCache):
+    """In-process cache bounded by bytes instead of entry count.
+
+    Values are pickled (as SimpleCache does), so each entry's size is known
+    exactly. When the total exceeds ``max_bytes``, entries are evicted
+    least-recently-used first, except that among the ``EVICTION_SAMPLE``
+    oldest the one with the lowest ``weight * (1 + hits)`` goes first
+    (weights by data type, see ``DEFAULT_TYPE_WEIGHTS``).
+
+    If process RSS crosses ``rss_watermark`` the cache sheds load: it evicts
+    down to half its budget and keeps accepting writes within that smaller
+    budget. CPython rarely hands freed memory back to the OS, so the full
+    budget returns only once RSS falls below ``RSS_RECOVERY_RATIO`` of the
+    watermark.
+
+    Use it with ``CACHE_TYPE = 'app.utils.memory_cache.BoundedMemoryCache'``.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 128 * 1024 * 1024,
+        rss_watermark: Optional[int] = None,
+        type_weights: Optional[Dict[str, float]] = None,
+        default_timeout: int = 300,
+    ):
+        super().__init__(default_timeout=default_timeout)
+        self.max_bytes = max_bytes
+        self.rss_watermark = rss_watermark
+        self.type_weights = type_weights or DEFAULT_TYPE_WEIGHTS
+        self._entries: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._rss_checked_at = 0.0
+        self._over_watermark = False
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        kwargs.update(
+            max_bytes=config.get('CACHE_MAX_BYTES', 128 * 1024 * 1024),
+            rss_watermark=config.get('CACHE_RSS_WATERMARK_BYTES'),
+        )
+        return cls(*args, **kwargs)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _weight(self, key: str) -> float:
+        match = _TYPE_PATTERN.search(key)
+        return self.type_weights.get(match.group(1), 1.0) if match else 1.0
+
+    def _expiry(self, timeout: Optional[int]) -> float:
+        timeout = self._normalize_timeout(timeout)
+        return time.time() + timeout if timeout > 0 else 0
+
+    def _remove(self, key: str) -> Optional[_Entry]:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.data)
+        return entry
+
+    def _evict_to(self, target: int, reason: str) -> None:
+        now = time.time()
+        while self._bytes > target and self._entries:
+            candidates = []
+            for key, entry in self._entries.items():
+                if entry.expires and entry.expires <= now:
+                    candidates = [(0.0, key)]
+                    break
+                candidates.append((entry.weight * (1 + entry.hits), key))
+                if len(candidates) >= EVICTION_SAMPLE:
+                    break
+            _, victim = min(candidates)  # ties go to the least recently used
+            self._remove(victim)
+            metrics.record_eviction(type(self).__name__, reason)
+            # Age the survivors so entries popular long ago can be evicted too.
+            for _, key in candidates:
+                if key in self._entries:
+                    entry = self._entries[key]
+                    self._entries[key] = entry._replace(hits=entry.hits // 2)
+
+    def _check_rss(self) -> bool:
+        """Return True while the budget is cut for RSS (re-read at most once a second)."""
+        if not self.rss_watermark:
+            return False
+        now = time.monotonic()
+        if now - self._rss_checked_at >= RSS_CHECK_INTERVAL:
+            self._rss_checked_at = now
+            rss = read_rss_bytes()
+            limit = self.rss_watermark * (RSS_RECOVERY_RATIO if self._over_watermark else 1)
+            over = rss is not None and rss > limit
+            if over and not self._over_watermark:
+                logger.warning(f"RSS {rss} bytes is over the cache watermark; halving the cache budget")
+            elif self._over_watermark and not over:
+                logger.info(f"RSS {rss} bytes is back under the cache watermark; restoring the cache budget")
+            self._over_watermark = over
+        return self._over_watermark
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires and entry.expires <= time.time():
+                self._remove(key)
+                return None
+            self._entries[key] = entry._replace(hits=entry.hits + 1)
+            self._entries.move_to_end(key)
+            data = entry.data
+        try:
+            return pickle.loads(data)
+        except pickle.PickleError:
+            return None
+
+    def set(self, key: str, value: Any, timeout: Optional[int] = None) -> bool:
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            budget = self.max_bytes
+            if self._check_rss():
+                budget = self.max_bytes // 2
+                self._evict_to(budget, 'rss')
+            if len(data) > budget:
+                return False
+            self._remove(key)
+            self._evict_to(budget - len(data), 'bytes')
+            self._entries[key] = _Entry(data, self._expiry(timeout), self._weight(key), 0)
+            self._bytes += len(data)
+        return True
+
+    def add(self, key: str, value: Any, timeout: Optional[int] = None) -> bool:
+        if self.has(key):
+            return False
+        return self.set(key, value, timeout)
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._remove(key) is not None
+
+    def has(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not (entry.expires and entry.expires <= time.time())
+
+    def clear(self) -> bool:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        return True
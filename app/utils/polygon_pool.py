@@ -0,0 +1,116 @@
+import threading
+from typing import Any, Dict, List, Optional
+
+import certifi
+import urllib3
+from polygon import RESTClient
+from urllib3.util.retry import Retry
+
+# Server errors urllib3 retries on its own. 429 is left to the rate limiter,
+# which backs off for every thread instead of each retrying independently.
+RETRY_STATUSES = (499, 500, 502, 503, 504)
+
+
+class PolygonClientPool:
+    """Builds the one Polygon ``RESTClient`` shared by all threads.
+
+    The client's urllib3 ``PoolManager`` is thread-safe, but its per-host
+    pool keeps a single connection by default, so concurrent fetches open
+    (and TLS-handshake) a new connection that is then thrown away. The
+    shared client gets a pool of ``maxsize`` kept-alive connections instead,
+    plus the configured timeouts and retries.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 15.0,
+        retries: int = 2,
+    ):
+        self.configure(maxsize, connect_timeout, read_timeout, retries)
+        self._client: Optional[RESTClient] = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        self.configure(
+            maxsize=app.config.get('POLYGON_POOL_MAXSIZE', self.maxsize),
+            connect_timeout=app.config.get('POLYGON_CONNECT_TIMEOUT', self.connect_timeout),
+            read_timeout=app.config.get('POLYGON_READ_TIMEOUT', self.read_timeout),
+            retries=app.config.get('POLYGON_RETRIES', self.retries),
+        )
+
+    def configure(self, maxsize: int, connect_timeout: float, read_timeout: float, retries: int) -> None:
+        self.maxsize = maxsize
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+
+    def build_pool_manager(self, headers: Dict[str, str]) -> urllib3.PoolManager:
+        return urllib3.PoolManager(
+            num_pools=4,
+            maxsize=self.maxsize,
+            block=False,
+            headers=headers,
+            ca_certs=certifi.where(),
+            cert_reqs='CERT_REQUIRED',
+            retries=Retry(
+                total=self.retries,
+                status_forcelist=RETRY_STATUSES,
+                backoff_factor=0.2,
+                respect_retry_after_header=True,
+            ),
+        )
+
+    def client(self, api_key: str) -> RESTClient:
+        """Return the shared client, creating it on first use."""
+        with self._lock:
+            if self._client is None or self._client.API_KEY != api_key:
+                client = RESTClient(
+                    api_key,
+                    connect_timeout=self.connect_timeout,
+                    read_timeout=self.read_timeout,
+                    retries=self.retries,
+                )
+                client.client = self.build_pool_manager(client.headers)
+                self._client = client
+            return self._client
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-host connection pool usage of the shared client."""
+        if self._client is None:
+            return []
+        return pool_stats(self._client.client)
+
+    def render_metrics(self) -> List[str]:
+        """Pool usage in Prometheus text format (see ``cache_monitor.register_collector``)."""
+        series = (
+            ('polygon_http_connections_opened_total', 'counter',
+             'Connections (TLS handshakes) opened to Polygon.', 'connections_opened'),
+            ('polygon_http_requests_total', 'counter', 'HTTP requests sent to Polygon.', 'requests'),
+            ('polygon_http_pool_available', 'gauge',
+             'Connection slots not checked out by a request.', 'available'),
+            ('polygon_http_pool_maxsize', 'gauge', 'Kept-alive connections per host.', 'maxsize'),
+        )
+        stats = self.stats()
+        lines = []
+        for name, kind, help_text, field in series:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            lines += [f'{name}{{host="{pool["host"]}"}} {pool[field]}' for pool in stats]
+        return lines
+
+
+def pool_stats(manager: urllib3.PoolManager) -> List[Dict[str, Any]]:
+    stats = []
+    for key in list(manager.pools.keys()):
+        pool = manager.pools.get(key)
+        if pool is None:
+            continue
+        stats.append({
+            'host': pool.host,
+            'connections_opened': pool.num_connections,
+            'requests': pool.num_requests,
+            'available': pool.pool.qsize() if pool.pool is not None else 0,
+            'maxsize': manager.connection_pool_kw.get('maxsize', 1),
+        })
+    return stats
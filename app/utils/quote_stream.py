@@ -0,0 +1,324 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set
+
+from polygon import WebSocketClient
+from polygon.websocket.models import Feed, Market
+
+logger = logging.getLogger(__name__)
+
+MAX_STREAM_SYMBOLS = 20     # symbols one dashboard connection may subscribe to
+HEARTBEAT_INTERVAL = 15.0   # seconds between keep-alive comments on an idle stream
+MAX_STREAM_CLIENTS = 4      # open streams per process; each holds a server thread
+RECONNECT_DELAY = 5.0       # seconds before reopening a dropped upstream feed
+
+Handler = Callable[[List[Any]], None]
+
+
+class Quote(NamedTuple):
+    symbol: str
+    price: float
+    size: Optional[float]
+    timestamp: Optional[int]    # exchange time, epoch milliseconds
+    received_at: float          # time.monotonic() when the quote arrived
+
+    def age(self) -> float:
+        return time.monotonic() - self.received_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'symbol': self.symbol, 'price': self.price, 'size': self.size, 'timestamp': self.timestamp}
+
+
+def quote_from_message(message: Any) -> Optional[Quote]:
+    """Build a quote from a Polygon trade/aggregate message or a replay dict."""
+    get = message.get if isinstance(message, dict) else (lambda name: getattr(message, name, None))
+    symbol = get('symbol')
+    price = get('price')
+    if price is None:
+        price = get('close')
+    if not symbol or price is None:
+        return None
+    size = get('size')
+    timestamp = get('timestamp') or get('end_timestamp')
+    return Quote(symbol, float(price), size if size is not None else get('volume'), timestamp, time.monotonic())
+
+
+class Subscription:
+    """Pending quotes for one connected client, coalesced to the latest per symbol."""
+
+    def __init__(self, symbols: Iterable[str]):
+        self.symbols = frozenset(symbols)
+        self._pending: Dict[str, Quote] = {}
+        self._cond = threading.Condition()
+
+    def push(self, quote: Quote) -> None:
+        with self._cond:
+            self._pending[quote.symbol] = quote
+            self._cond.notify()
+
+    def wait(self, timeout: float) -> List[Quote]:
+        """Return the quotes received since the last call, waiting up to ``timeout`` for one."""
+        with self._cond:
+            if not self._pending:
+                self._cond.wait(timeout)
+            quotes = list(self._pending.values())
+            self._pending.clear()
+        return quotes
+
+
+class QuoteTable:
+    """Latest quote per symbol, fanned out to the subscriptions that show it."""
+
+    def __init__(self):
+        self._quotes: Dict[str, Quote] = {}
+        self._subscriptions: Set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._quotes)
+
+    def update(self, quote: Quote) -> bool:
+        """Store ``quote`` unless a newer one is already held; True if stored."""
+        with self._lock:
+            current = self._quotes.get(quote.symbol)
+            if (current is not None and current.timestamp and quote.timestamp
+                    and quote.timestamp < current.timestamp):
+                return False
+            self._quotes[quote.symbol] = quote
+            subscribers = [s for s in self._subscriptions if quote.symbol in s.symbols]
+        for subscription in subscribers:
+            subscription.push(quote)
+        return True
+
+    def latest(self, symbol: str) -> Optional[Quote]:
+        return self._quotes.get(symbol)
+
+    def snapshot(self, symbols: Iterable[str]) -> List[Quote]:
+        return [self._quotes[s] for s in symbols if s in self._quotes]
+
+    def subscribe(self, symbols: Iterable[str], limit: Optional[int] = None) -> Optional[Subscription]:
+        """Add a subscription, or return None if ``limit`` subscriptions are already open."""
+        subscription = Subscription(symbols)
+        with self._lock:
+            if limit is not None and len(self._subscriptions) >= limit:
+                return None
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def watched(self) -> Set[str]:
+        """Symbols at least one subscription is showing."""
+        with self._lock:
+            return set().union(*(s.symbols for s in self._subscriptions))
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._quotes.clear()
+            self._subscriptions.clear()
+
+
+class ReplayFeed:
+    """Plays recorded quotes (dicts with symbol, price, size, timestamp) as if streamed.
+
+    Stands in for the websocket in tests and offline development.
+    """
+
+    def __init__(self, messages: Iterable[Dict[str, Any]], interval: float = 1.0):
+        self.messages = list(messages)
+        self.interval = interval
+
+    @classmethod
+    def load(cls, path: str, interval: float = 1.0) -> 'ReplayFeed':
+        """Read one JSON message per line from ``path``."""
+        with open(path) as replay:
+            return cls((json.loads(line) for line in replay if line.strip()), interval)
+
+    def set_symbols(self, symbols: Set[str]) -> None:
+        pass  # replays everything
+
+    def run(self, handle: Handler, stop: threading.Event) -> None:
+        for message in self.messages:
+            if stop.is_set():
+                return
+            handle([message])
+            if self.interval and stop.wait(self.interval):
+                return
+
+    def close(self) -> None:
+        pass
+
+
+class PolygonFeed:
+    """Polygon stocks websocket, subscribed to the symbols dashboards are showing.
+
+    ``channel`` is ``A`` (per-second aggregates) or ``T`` (trades).
+    """
+
+    def __init__(self, api_key: str, feed: str = 'delayed', channel: str = 'A'):
+        self.channel = channel
+        self.client = WebSocketClient(
+            api_key=api_key,
+            feed=Feed.RealTime if feed == 'realtime' else Feed.Delayed,
+            market=Market.Stocks,
+            subscriptions=[],
+            max_reconnects=None,
+        )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def set_symbols(self, symbols: Set[str]) -> None:
+        wanted = {f"{self.channel}.{symbol}" for symbol in symbols}
+        current = set(self.client.scheduled_subs)
+        if current - wanted:
+            self.client.unsubscribe(*(current - wanted))
+        if wanted - current:
+            self.client.subscribe(*(wanted - current))
+
+    def run(self, handle: Handler, stop: threading.Event) -> None:
+        async def processor(messages):
+            handle(messages)
+
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self.client.connect(processor))
+        finally:
+            self._loop.close()
+            self._loop = None
+
+    def close(self) -> None:
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.client.close(), loop)
+
+
+class QuoteStream:
+    """Live quotes for the dashboard: a feed thread writing into a :class:`QuoteTable`.
+
+    Disabled unless ``STREAMING_ENABLED`` is set. The feed is Polygon's
+    websocket, or a :class:`ReplayFeed` when ``STREAM_REPLAY_FILE`` is given.
+    Upstream subscriptions follow the symbols connected clients are showing.
+    At most ``STREAM_MAX_CLIENTS`` clients are streamed to at once, so open
+    dashboards cannot take every server thread.
+    """
+
+    def __init__(self):
+        self.table = QuoteTable()
+        self.feed = None
+        self.max_clients = MAX_STREAM_CLIENTS
+        self.received: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.feed is not None
+
+    def init_app(self, app) -> None:
+        self.stop()
+        self.table.clear()
+        self.max_clients = app.config.get('STREAM_MAX_CLIENTS', MAX_STREAM_CLIENTS)
+        if not app.config.get('STREAMING_ENABLED'):
+            return
+        replay = app.config.get('STREAM_REPLAY_FILE')
+        if replay:
+            feed = ReplayFeed.load(replay, interval=app.config.get('STREAM_REPLAY_INTERVAL', 1.0))
+        else:
+            api_key = app.config.get('POLYGON_API_KEY') or os.getenv('POLYGON_API_KEY')
+            if not api_key:
+                logger.warning("STREAMING_ENABLED is set but POLYGON_API_KEY is not; live quotes are off")
+                return
+            feed = PolygonFeed(api_key, feed=app.config.get('STREAM_FEED', 'delayed'),
+                               channel=app.config.get('STREAM_CHANNEL', 'A'))
+        self.start(feed)
+
+    def start(self, feed) -> None:
+        self.feed = feed
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(feed, self._stop), name='quote-stream', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self.feed is not None:
+            self._stop.set()
+            self.feed.close()
+            self.feed = None
+            self._thread = None
+
+    def _run(self, feed, stop: threading.Event) -> None:
+        while not stop.is_set():
+            try:
+                feed.run(self.handle, stop)
+            except Exception as e:
+                logger.error(f"Quote feed failed: {str(e)}")
+            if isinstance(feed, ReplayFeed) or stop.wait(RECONNECT_DELAY):
+                return
+
+    def handle(self, messages: List[Any]) -> None:
+        for message in messages:
+            quote = quote_from_message(message)
+            if quote is not None and self.table.update(quote):
+                self.received[quote.symbol] += 1
+
+    def latest(self, symbol: str) -> Optional[Quote]:
+        return self.table.latest(symbol)
+
+    def subscribe(self, symbols: Iterable[str]) -> Optional[Subscription]:
+        """Subscribe a client to ``symbols``; None when ``max_clients`` are already streaming."""
+        subscription = self.table.subscribe(symbols, limit=self.max_clients)
+        if subscription is not None:
+            self._resubscribe()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.table.unsubscribe(subscription)
+        self._resubscribe()
+
+    def _resubscribe(self) -> None:
+        feed = self.feed
+        if feed is not None:
+            feed.set_symbols(self.table.watched())
+
+    def events(self, subscription: Subscription, heartbeat: float = HEARTBEAT_INTERVAL) -> Iterator[str]:
+        """Server-sent events for ``subscription``: a snapshot, then each new quote.
+
+        Quotes arriving faster than the client reads are coalesced to the
+        latest per symbol. An idle stream sends a comment every ``heartbeat``
+        seconds so a disconnected client is noticed and its subscription dropped.
+        """
+        try:
+            yield f"retry: {int(RECONNECT_DELAY * 1000)}\n\n"
+            for quote in self.table.snapshot(sorted(subscription.symbols)):
+                yield _sse(quote)
+            while True:
+                quotes = subscription.wait(heartbeat)
+                if not quotes:
+                    yield ": keep-alive\n\n"
+                for quote in quotes:
+                    yield _sse(quote)
+        finally:
+            self.unsubscribe(subscription)
+
+    def render_metrics(self) -> List[str]:
+        """Stream state in Prometheus text format (see ``cache_monitor.register_collector``)."""
+        name = 'quote_stream_messages_total'
+        lines = [f"# HELP {name} Quotes received from the live feed.", f"# TYPE {name} counter"]
+        lines += [f'{name}{{symbol="{symbol}"}} {count}' for symbol, count in sorted(self.received.items())]
+        name = 'quote_stream_subscribers'
+        lines += [f"# HELP {name} Connected live-quote clients.", f"# TYPE {name} gauge",
+                  f"{name} {self.table.subscriber_count}"]
+        return lines
+
+
+def _sse(quote: Quote) -> str:
+    return f"event: quote\ndata: {json.dumps(quote.to_dict())}\n\n"
@@ -0,0 +1,148 @@
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+# Lower values are served first.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_PREFETCH = 1
+PRIORITY_BACKFILL = 2
+
+_current_priority: ContextVar[int] = ContextVar('polygon_priority', default=PRIORITY_INTERACTIVE)
+
+
+class RateLimitTimeout(RuntimeError):
+    """Raised when a caller cannot get a request slot within its wait budget."""
+
+
+@contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """Run the enclosed Polygon calls at ``priority`` (e.g. PRIORITY_PREFETCH)."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class PolygonRateLimiter:
+    """Client-side token bucket for Polygon calls with a priority wait queue.
+
+    The bucket refills at the plan's requests-per-minute and holds up to
+    ``burst`` tokens. Callers waiting for a token are served lowest priority
+    value first, so interactive searches overtake prefetch and backfill work.
+    A 429 empties the bucket, pauses every caller for an exponentially growing
+    cooldown and halves the refill rate; successful calls restore it gradually.
+
+    The limit is per process: with several workers, configure each with its
+    share of the plan. A limit of 0 disables limiting.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        burst: Optional[int] = None,
+        max_wait: float = 30.0,
+        base_cooldown: float = 5.0,
+        max_cooldown: float = 60.0,
+        min_rate_scale: float = 0.125,
+    ):
+        self._cond = threading.Condition()
+        self._sequence = itertools.count()
+        self._waiters: List[Tuple[int, int]] = []
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.min_rate_scale = min_rate_scale
+        self.configure(requests_per_minute, burst=burst, max_wait=max_wait)
+
+    def init_app(self, app) -> None:
+        self.configure(
+            app.config.get('POLYGON_REQUESTS_PER_MINUTE', 0),
+            burst=app.config.get('POLYGON_RATE_LIMIT_BURST'),
+            max_wait=app.config.get('POLYGON_RATE_LIMIT_MAX_WAIT', 30.0),
+        )
+
+    def configure(self, requests_per_minute: int, burst: Optional[int] = None, max_wait: float = 30.0) -> None:
+        with self._cond:
+            self.requests_per_minute = requests_per_minute or 0
+            self.capacity = float(burst or max(self.requests_per_minute, 1))
+            self.max_wait = max_wait
+            self._tokens = self.capacity
+            self._last_refill = time.monotonic()
+            self._rate_scale = 1.0
+            self._paused_until = 0.0
+            self._consecutive_limited = 0
+            self._cond.notify_all()
+
+    @property
+    def enabled(self) -> bool:
+        return self.requests_per_minute > 0
+
+    def _rate(self) -> float:
+        return self.requests_per_minute / 60.0 * self._rate_scale
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self._rate())
+        self._last_refill = now
+
+    def _discard(self, ticket: Tuple[int, int]) -> None:
+        if self._waiters and self._waiters[0] == ticket:
+            heapq.heappop(self._waiters)
+        elif ticket in self._waiters:
+            self._waiters.remove(ticket)
+            heapq.heapify(self._waiters)
+
+    def acquire(self, priority: Optional[int] = None, timeout: Optional[float] = None) -> None:
+        """Block until a request slot is available for this caller."""
+        if not self.enabled:
+            return
+        priority = _current_priority.get() if priority is None else priority
+        deadline = time.monotonic() + (self.max_wait if timeout is None else timeout)
+
+        with self._cond:
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = self._paused_until - now
+                    if wait <= 0 and self._tokens >= 1:
+                        if self._waiters[0] == ticket:
+                            self._tokens -= 1
+                            return
+                        wait = None  # a higher-priority caller goes first
+                    elif wait <= 0:
+                        wait = (1 - self._tokens) / self._rate()
+
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise RateLimitTimeout('Timed out waiting for a Polygon request slot')
+                    self._cond.wait(remaining if wait is None else min(wait, remaining))
+            finally:
+                self._discard(ticket)
+                self._cond.notify_all()
+
+    def record_rate_limited(self) -> None:
+        """Back off after Polygon answered 429."""
+        if not self.enabled:
+            return
+        with self._cond:
+            now = time.monotonic()
+            cooldown = min(self.max_cooldown, self.base_cooldown * 2 ** self._consecutive_limited)
+            self._consecutive_limited += 1
+            self._paused_until = max(self._paused_until, now + cooldown)
+            self._rate_scale = max(self.min_rate_scale, self._rate_scale / 2)
+            self._tokens = 0.0
+            self._last_refill = now
+
+    def record_success(self) -> None:
+        if not self.enabled or (self._consecutive_limited == 0 and self._rate_scale >= 1.0):
+            return
+        with self._cond:
+            self._refill(time.monotonic())
+            self._consecutive_limited = 0
+            self._rate_scale = min(1.0, self._rate_scale + 0.125)
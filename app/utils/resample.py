@@ -0,0 +1,107 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .bars import BarSeries
+from .market_calendar import EASTERN_TZ, session_bounds
+
+MINUTE_MS = 60_000
+
+# Bar interval the chart (and the historical API) uses per period: a few
+# hundred points each instead of up to ~2,500 daily bars.
+PERIOD_INTERVALS = {
+    '5Y': '1-week',
+    '10Y': '1-month',
+    'MAX': '1-month',
+}
+
+
+def _aggregate(
+    bars: BarSeries, buckets: np.ndarray, interval: str, stamps: Optional[np.ndarray] = None
+) -> BarSeries:
+    """Collapse runs of equal ``buckets`` (sorted, one per bar) into single bars.
+
+    Each bar is stamped with its bucket value, or with ``stamps`` of the
+    bucket's first bar when given.
+    """
+    if not len(bars):
+        return BarSeries.empty(interval=interval)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(bars)] - 1
+    return BarSeries(
+        (buckets if stamps is None else stamps)[starts],
+        bars.open[starts],
+        np.maximum.reduceat(bars.high, starts),
+        np.minimum.reduceat(bars.low, starts),
+        bars.close[ends],
+        np.add.reduceat(bars.volume, starts),
+        interval=interval,
+    )
+
+
+def _local_days(timestamps: np.ndarray) -> np.ndarray:
+    """Eastern calendar day of each epoch-ms timestamp, as datetime64[D]."""
+    local = pd.to_datetime(timestamps, unit='ms', utc=True).tz_convert(EASTERN_TZ).tz_localize(None)
+    return local.values.astype('datetime64[D]')
+
+
+def resample_minutes(bars: BarSeries, minutes: int) -> BarSeries:
+    """Aggregate minute bars into ``minutes``-minute bars.
+
+    Buckets start at each session's open (9:30 ET), so every width lines up
+    with the session and no bucket spans two sessions. Each bar is stamped
+    with its bucket's start time, as Polygon does.
+    """
+    if minutes == 1:
+        return bars
+    interval = f"{minutes}-minute"
+    if not len(bars):
+        return BarSeries.empty(interval=interval)
+    width = minutes * MINUTE_MS
+    days = _local_days(bars.timestamps[[0, -1]])
+    opens = session_bounds(str(days[0]), str(days[-1]))[:, 0]
+    session = np.searchsorted(opens, bars.timestamps, side='right') - 1
+    # Bars before the first open (none after session masking) align to the epoch.
+    anchors = np.where(session >= 0, opens[np.maximum(session, 0)], 0) if len(opens) else 0
+    return _aggregate(bars, anchors + (bars.timestamps - anchors) // width * width, interval=interval)
+
+
+def resample_weeks(bars: BarSeries) -> BarSeries:
+    """Aggregate daily bars into Monday-to-Friday weekly bars.
+
+    Each weekly bar is stamped with its first trading day, so holiday-shortened
+    weeks still date to a session.
+    """
+    days = _local_days(bars.timestamps).astype(np.int64)
+    weeks = (days + 3) // 7     # 1970-01-01 was a Thursday; weeks start on Monday
+    return _aggregate(bars, weeks, interval='1-week', stamps=bars.timestamps)
+
+
+def resample_months(bars: BarSeries) -> BarSeries:
+    """Aggregate daily bars into calendar-month bars stamped with their first trading day."""
+    months = _local_days(bars.timestamps).astype('datetime64[M]').astype(np.int64)
+    return _aggregate(bars, months, interval='1-month', stamps=bars.timestamps)
+
+
+def resample(bars: BarSeries, interval: str) -> BarSeries:
+    """Derive ``interval`` bars (``N-minute``, ``1-day``, ``1-week`` or ``1-month``) from finer ones."""
+    if interval == bars.interval:
+        return bars
+    count, _, unit = interval.partition('-')
+    if unit == 'minute':
+        return resample_minutes(bars, int(count))
+    if interval == '1-week':
+        return resample_weeks(bars)
+    if interval == '1-month':
+        return resample_months(bars)
+    raise ValueError(f"Cannot resample {bars.interval} bars to {interval}")
+
+
+def interval_for_days(days: int) -> str:
+    """Bar interval for a window of ``days`` calendar days of daily history."""
+    if days > 365 * 5:
+        return '1-month'
+    if days > 365 * 2:
+        return '1-week'
+    return '1-day'
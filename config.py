@@ -20,7 +20,56 @@ class Config:
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
-    # Caching (Flask-Caching). SimpleCache is in-process; set CACHE_TYPE to
-    # RedisCache (with CACHE_REDIS_URL) for multi-worker deployments.
-    CACHE_TYPE = os.environ.get('CACHE_TYPE', 'SimpleCache')
-    CACHE_DEFAULT_TIMEOUT = 300
\ No newline at end of file
+    # Caching (Flask-Caching). The default backend is in-process and bounded
+    # by CACHE_MAX_BYTES; set CACHE_TYPE to RedisCache (with CACHE_REDIS_URL)
+    # for multi-worker deployments.
+    CACHE_TYPE = os.environ.get('CACHE_TYPE', 'app.utils.memory_cache.BoundedMemoryCache')
+    CACHE_DEFAULT_TIMEOUT = 300
+    CACHE_MAX_BYTES = int(os.environ.get('CACHE_MAX_BYTES', 128 * 1024 * 1024))
+    # Above this process RSS the in-process cache halves its budget
+    # (sized for a 512 MB instance; 0 disables the check).
+    CACHE_RSS_WATERMARK_BYTES = int(os.environ.get('CACHE_RSS_WATERMARK_BYTES', 400 * 1024 * 1024)) or None
+    # How StockCache encodes values: 'pickle' leaves it to the backend,
+    # 'packed' writes compact compressed binary (worth it over the network).
+    CACHE_SERIALIZER = os.environ.get(
+        'CACHE_SERIALIZER', 'packed' if CACHE_TYPE == 'RedisCache' else 'pickle'
+    )
+    CACHE_MAX_VALUE_BYTES = int(os.environ.get('CACHE_MAX_VALUE_BYTES', 512 * 1024))
+    # Per-process LRU in front of a shared backend (0 entries disables it).
+    # Entries are trusted for CACHE_L1_TTL seconds, then revalidated against
+    # a version stamp in the backend.
+    CACHE_L1_MAX_ENTRIES = int(os.environ.get(
+        'CACHE_L1_MAX_ENTRIES', 2048 if CACHE_TYPE == 'RedisCache' else 0
+    ))
+    CACHE_L1_MAX_BYTES = int(os.environ.get('CACHE_L1_MAX_BYTES', 64 * 1024 * 1024))
+    CACHE_L1_TTL = float(os.environ.get('CACHE_L1_TTL', 5))
+
+    # Polygon plan limit, enforced per process by the client-side rate limiter
+    # (0 disables it). The free plan allows 5 requests per minute.
+    POLYGON_REQUESTS_PER_MINUTE = int(os.environ.get('POLYGON_REQUESTS_PER_MINUTE', 5))
+    POLYGON_RATE_LIMIT_MAX_WAIT = float(os.environ.get('POLYGON_RATE_LIMIT_MAX_WAIT', 30))
+
+    # In-process cache warm-up before each open and after each close. Enable
+    # it in one process only (e.g. not in every gunicorn worker); otherwise run
+    # `flask warm-cache` from a scheduler.
+    CACHE_WARMER_ENABLED = os.environ.get('CACHE_WARMER_ENABLED', '').lower() in ('1', 'true', 'yes')
+    CACHE_WARMER_CONCURRENCY = int(os.environ.get('CACHE_WARMER_CONCURRENCY', 2))
+
+    # Polygon HTTP client: kept-alive connections shared by all threads,
+    # per-request timeouts (seconds) and retries on 5xx responses.
+    POLYGON_POOL_MAXSIZE = int(os.environ.get('POLYGON_POOL_MAXSIZE', 10))
+    POLYGON_CONNECT_TIMEOUT = float(os.environ.get('POLYGON_CONNECT_TIMEOUT', 5))
+    POLYGON_READ_TIMEOUT = float(os.environ.get('POLYGON_READ_TIMEOUT', 15))
+    POLYGON_RETRIES = int(os.environ.get('POLYGON_RETRIES', 2))
+
+    # Live quotes from Polygon's websocket, pushed to dashboards over SSE.
+    # STREAM_FEED is 'delayed' or 'realtime' (plan dependent); STREAM_CHANNEL
+    # is 'A' (per-second aggregates) or 'T' (trades). STREAM_REPLAY_FILE plays
+    # recorded quotes (JSON lines) instead, for local development.
+    # STREAM_MAX_CLIENTS caps open streams per process (each holds a thread).
+    STREAMING_ENABLED = os.environ.get('STREAMING_ENABLED', '').lower() in ('1', 'true', 'yes')
+    STREAM_FEED = os.environ.get('STREAM_FEED', 'delayed')
+    STREAM_CHANNEL = os.environ.get('STREAM_CHANNEL', 'A')
+    STREAM_REPLAY_FILE = os.environ.get('STREAM_REPLAY_FILE')
+    STREAM_REPLAY_INTERVAL = float(os.environ.get('STREAM_REPLAY_INTERVAL', 1))
+    STREAM_MAX_CLIENTS = int(os.environ.get('STREAM_MAX_CLIENTS', 4))
@@ -0,0 +1,73 @@
+/*
+ * Live prices over server-sent events.
+ *
+ * Spans rendered with class `live-price` and a `data-symbol` attribute (only
+ * when STREAMING_ENABLED is set) are kept up to date from
+ * /stock/api/stream. One EventSource is open at a time, subscribed to
+ * exactly the symbols currently on the page; it is reopened whenever that
+ * set changes and closed when no live prices are shown.
+ */
+(function () {
+    var source = null;
+    var streamed = '';
+
+    function shownSymbols() {
+        var symbols = {};
+        document.querySelectorAll('.live-price[data-symbol]').forEach(function (el) {
+            symbols[el.getAttribute('data-symbol')] = true;
+        });
+        return Object.keys(symbols).sort().join(',');
+    }
+
+    function applyQuote(event) {
+        var quote = JSON.parse(event.data);
+        document.querySelectorAll('.live-price[data-symbol="' + quote.symbol + '"]').forEach(function (el) {
+            var previous = parseFloat(el.textContent.replace(/[^0-9.\-]/g, ''));
+            // Edit React's own text node rather than replacing it.
+            var text = el.firstChild;
+            if (text && text.nodeType === Node.TEXT_NODE) {
+                text.nodeValue = '$' + quote.price.toFixed(2);
+            } else {
+                el.textContent = '$' + quote.price.toFixed(2);
+            }
+            if (!isNaN(previous) && previous !== quote.price) {
+                var tick = quote.price > previous ? 'tick-up' : 'tick-down';
+                el.classList.add(tick);
+                setTimeout(function () { el.classList.remove(tick); }, 600);
+            }
+        });
+    }
+
+    function sync() {
+        var symbols = shownSymbols();
+        if (symbols === streamed) {
+            return;
+        }
+        if (source) {
+            source.close();
+            source = null;
+        }
+        streamed = symbols;
+        if (symbols && window.EventSource) {
+            source = new EventSource('/stock/api/stream?symbols=' + encodeURIComponent(symbols));
+            source.addEventListener('quote', applyQuote);
+        }
+    }
+
+    var pending = false;
+    new MutationObserver(function () {
+        if (!pending) {
+            pending = true;
+            window.requestAnimationFrame(function () {
+                pending = false;
+                sync();
+            });
+        }
+    }).observe(document.documentElement, {childList: true, subtree: true});
+
+    window.addEventListener('beforeunload', function () {
+        if (source) {
+            source.close();
+        }
+    });
+})();
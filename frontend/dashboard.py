@@ -1,19 +1,26 @@
 import dash
-from dash import html, dcc, Input, Output, State, callback_context, no_update, ALL
+from dash import html, dcc, Input, Output, State, Patch, callback_context, no_update, ALL
 import dash_bootstrap_components as dbc
 import plotly.graph_objs as go
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
 from app import db
+from app.extensions import quote_stream
 from flask_login import current_user
 from app.models import Watchlist, Stock
 from app.services.stock_services import (
-    get_stock_data,
-    get_stock_price,
     get_company_details,
     get_intraday_stock_data,
+    get_stock_data,
 )
+from app.services.chart_store import get_chart_bars, make_chart_handle
+from app.services.quote_bundle import get_quote_bundle
+from app.utils.bars import BarSeries
+from app.utils.downsample import lttb_indices, minmax_indices
+from app.utils.market_calendar import is_market_open
+from app.utils.resample import PERIOD_INTERVALS, resample
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 import json
@@ -141,9 +148,9 @@ PERIOD_BUTTON_TITLES = {
     '6M': 'Daily bars for the last 6 months',
     'YTD': 'Daily bars since January 1',
     '1Y': 'Daily bars for the last year',
-    '5Y': 'Daily bars for the last 5 years',
-    '10Y': 'Daily bars for the last 10 years',
-    'MAX': 'All available daily history',
+    '5Y': 'Weekly bars for the last 5 years',
+    '10Y': 'Monthly bars for the last 10 years',
+    'MAX': 'Monthly bars for all available history',
 }
 
 
@@ -207,6 +214,14 @@ def filter_data_for_period(df, period):
     return filtered
 
 
+def resample_for_period(df, period):
+    """Return filtered daily bars at the chart resolution for ``period`` (see ``PERIOD_INTERVALS``)."""
+    interval = PERIOD_INTERVALS.get(period)
+    if interval is None or df.empty:
+        return df
+    return resample(BarSeries.from_frame(df), interval).to_frame()
+
+
 def calculate_period_change(df):
     """(last_close - first_close) / first_close * 100 over the filtered range."""
     if df.empty or len(df) < 1:
@@ -234,6 +249,75 @@ def calculate_fifty_two_week_range(df):
     return f"${low:.2f} - ${high:.2f}"
 
 
+INTRADAY_REFRESH_MS = 60 * 1000
+
+
+def intraday_mark(bars):
+    """Summarize what the client holds of an intraday series, for delta refreshes."""
+    if not bars:
+        return None
+    return {
+        'first': int(bars.timestamps[0]),
+        'last': int(bars.timestamps[-1]),
+        'count': len(bars),
+        'close': float(bars.close[-1]),
+        'volume': float(bars.volume[-1]),
+    }
+
+
+def intraday_delta(bars, mark):
+    """Return a ``Patch`` bringing the client's intraday records up to ``bars``.
+
+    The client's copy is described by ``mark`` (see ``intraday_mark``). Its
+    last bar may have been incomplete, so it is resent along with any newer
+    bars. Returns the full records if the client holds another session, and
+    None when nothing changed.
+    """
+    if not mark or not bars or int(bars.timestamps[0]) != mark['first'] or len(bars) < mark['count']:
+        return bars.to_records()
+    if intraday_mark(bars) == mark:
+        return None
+    start = mark['count'] - 1
+    records = bars[start:].to_records()
+    patch = Patch()
+    patch[start] = records[0]
+    patch.extend(records[1:])
+    return patch
+
+
+def intraday_figure_patch(bars, mark, max_points):
+    """Return a ``Patch`` extending the 1D chart from ``mark`` to ``bars``.
+
+    The figure counterpart of ``intraday_delta``: the last bar the client drew
+    is redrawn and newer bars are appended to the price and volume traces,
+    and the price axis is re-fitted. Returns None when the chart must be
+    rebuilt instead (another session, or more bars than ``max_points``, so
+    the figure is downsampled).
+    """
+    if (not mark or not bars or int(bars.timestamps[0]) != mark['first']
+            or not mark['count'] <= len(bars) <= max_points
+            or np.isnan(bars.volume).all()):
+        return None
+    start = mark['count'] - 1
+    new = bars[start:].to_frame()
+    patch = Patch()
+    price, volume = patch['data'][0], patch['data'][1]
+    for target, values in (
+        (price['x'], new['datetime'].tolist()),
+        (price['y'], new['close'].tolist()),
+        (volume['x'], new['datetime'].tolist()),
+        (volume['y'], new['volume'].tolist()),
+        (volume['marker']['color'], _volume_colors(bars.close, range(start, len(bars)))),
+    ):
+        target[start] = values[0]
+        target.extend(values[1:])
+    price_range = _price_axis_range(bars.to_frame())
+    if price_range:
+        patch['layout']['yaxis']['range'] = price_range
+        patch['layout']['yaxis']['tickformat'] = _price_tick_format(price_range)
+    return patch
+
+
 def calculate_intraday_period_change(df):
     """Return regular-session 1D performance from first bar open to latest close."""
     if df.empty or len(df) < 1 or 'open' not in df.columns or 'close' not in df.columns:
@@ -295,11 +379,34 @@ def _date_axis_tick_spacing(period):
     return 'M1'
 
 
-def create_stock_chart_figure(df, symbol, period=None):
+CHART_POINTS_DEFAULT = 800
+
+
+def chart_point_budget(width):
+    """Points per trace for a chart ``width`` pixels wide: about one per pixel."""
+    if not width:
+        return CHART_POINTS_DEFAULT
+    return int(min(max(width, 200), 2000))
+
+
+def _volume_colors(closes, indices):
+    """Volume bar colours for ``indices``: up or down against the previous close."""
+    return ['rgba(148, 163, 184, 0.20)' if i == 0
+            else 'rgba(74, 222, 128, 0.20)' if closes[i] >= closes[i - 1]
+            else 'rgba(248, 113, 113, 0.20)'
+            for i in indices]
+
+
+def create_stock_chart_figure(df, symbol, period=None, max_points=None):
     """Price line + area (top) and volume bars (bottom) with shared x-axis.
 
     Y-axes are placed on the right. Plotly's built-in rangeselector is omitted
     so that the custom Dash period buttons are the sole period control.
+
+    With ``max_points``, longer series are downsampled before plotting: the
+    price line by LTTB, which keeps its shape, and the volume bars by
+    per-bucket min/max, which keeps spikes. The price axis range still
+    covers every bar.
     """
     is_intraday = period == '1D'
 
@@ -346,10 +453,22 @@ def create_stock_chart_figure(df, symbol, period=None):
         else '<b>%{x|%b %d, %Y}</b><br>$%{y:.2f}<extra></extra>'
     )
 
+    price_df = df
+    volume_indices = range(len(df))
+    if max_points and len(df) > max_points:
+        x_values = pd.to_datetime(df[x_col], utc=True).astype('int64').to_numpy()
+        price_df = df.iloc[lttb_indices(x_values, df['close'].to_numpy(dtype=float), max_points)]
+        if 'volume' in df.columns:
+            volume_indices = minmax_indices(df['volume'].fillna(0).to_numpy(dtype=float), max_points)
+
+    # The live 1D chart is extended in place by ``intraday_figure_patch``,
+    # which needs plain JSON arrays rather than Plotly's packed typed arrays.
+    column = (lambda frame, name: frame[name].tolist()) if is_intraday else (lambda frame, name: frame[name])
+
     # --- price line with area fill ---
     fig.add_trace(go.Scatter(
-        x=df[x_col],
-        y=df['close'],
+        x=column(price_df, x_col),
+        y=column(price_df, 'close'),
         mode='lines',
         line=dict(color='#38bdf8', width=2, shape='spline'),
         fill='tozeroy',
@@ -360,14 +479,14 @@ def create_stock_chart_figure(df, symbol, period=None):
 
     # --- volume bars (subtle, no axis labels) ---
     if 'volume' in df.columns and df['volume'].notna().any():
-        colors = ['rgba(148, 163, 184, 0.20)' if i == 0
-                  else 'rgba(74, 222, 128, 0.20)' if df['close'].iloc[i] >= df['close'].iloc[i - 1]
-                  else 'rgba(248, 113, 113, 0.20)'
-                  for i in range(len(df))]
+        # Colour each sampled bar by its close against the previous bar of the
+        # full frame, not the previous sampled bar.
+        colors = _volume_colors(df['close'].to_numpy(), volume_indices)
+        volume_df = df.iloc[volume_indices]
 
         fig.add_trace(go.Bar(
-            x=df[x_col],
-            y=df['volume'],
+            x=column(volume_df, x_col),
+            y=column(volume_df, 'volume'),
             marker_color=colors,
             name='Volume',
             hovertemplate=(
@@ -732,10 +851,12 @@ def create_layout():
             ], lg=8, md=12)
         ], className='g-4'),
 
-        # Data stores for chart period selection
+        # Data stores for chart period selection (`stock-ohlcv-store` holds a
+        # handle to bars kept server-side, see app.services.chart_store)
         dcc.Store(id='stock-ohlcv-store', data=None),
         dcc.Store(id='stock-intraday-store', data=None),
         dcc.Store(id='stock-symbol-store', data=None),
+        dcc.Store(id='chart-width-store', data=None),
 
         # Toast feedback infrastructure
         dcc.Store(id='toast-trigger', data=None),
@@ -756,6 +877,19 @@ def create_layout():
 
 
 def register_callbacks(dash_app):
+    # Chart width in pixels, measured in the browser; sets the chart's point
+    # budget. Re-measured on each watchlist tick to follow window resizes.
+    dash_app.clientside_callback(
+        """
+        function(n_intervals) {
+            var container = document.getElementById('stock-chart-container');
+            return container ? container.clientWidth : window.innerWidth;
+        }
+        """,
+        Output('chart-width-store', 'data'),
+        Input('watchlist-interval', 'n_intervals'),
+    )
+
     @dash_app.callback(Output('watchlist-dropdown', 'options'),
                     Input('watchlist-interval', 'n_intervals'))
     def update_watchlist_dropdown(n_intervals):
@@ -947,9 +1081,11 @@ def register_callbacks(dash_app):
         Input('search-button', 'n_clicks'),
         Input('stock-input', 'n_submit')],
         [State({'type': 'load-watchlist-stock', 'index': ALL}, 'id'),
-        State('stock-input', 'value')]
+        State('stock-input', 'value'),
+        State('chart-width-store', 'data')]
     )
-    def update_stock_data(watchlist_clicks, search_clicks, search_submit, watchlist_stock_ids, search_input):
+    def update_stock_data(watchlist_clicks, search_clicks, search_submit, watchlist_stock_ids, search_input,
+                          chart_width):
         ctx = callback_context
         trigger_source = None # To track 'watchlist' or 'search'
         clicked_stock = None
@@ -988,9 +1124,9 @@ def register_callbacks(dash_app):
         if not clicked_stock or not trigger_source:
             return no_update, no_update, no_update, no_update, no_update, no_update
 
-        stock_info, df = fetch_and_display_stock_data(clicked_stock)
+        stock_info, bars = fetch_and_display_stock_data(clicked_stock)
 
-        if df.empty:
+        if not bars:
             chart_container = html.Div(
                 f"No chart data available for {clicked_stock}",
                 style={'color': COLORS['text_muted'], 'padding': '40px', 'textAlign': 'center'},
@@ -1002,9 +1138,11 @@ def register_callbacks(dash_app):
 
         # Default period is 1Y; build initial chart and toolbar
         default_period = '1Y'
-        filtered_df = filter_data_for_period(df, default_period)
+        filtered_df = filter_data_for_period(bars.to_frame(), default_period)
         pct_change = calculate_period_change(filtered_df)
-        chart_fig = create_stock_chart_figure(filtered_df, clicked_stock, period=default_period)
+        chart_fig = create_stock_chart_figure(
+            resample_for_period(filtered_df, default_period), clicked_stock, period=default_period,
+            max_points=chart_point_budget(chart_width))
         toolbar = build_period_toolbar(default_period, pct_change)
 
         chart_container = html.Div([
@@ -1038,10 +1176,17 @@ def register_callbacks(dash_app):
                     ],
                 },
             ),
+            # Live 1D refresh: enabled while the 1D chart is shown during a
+            # session; each tick sends only the new bars.
+            dcc.Interval(id='intraday-interval', interval=INTRADAY_REFRESH_MS, disabled=True),
+            dcc.Store(id='stock-intraday-mark', data=None),
         ], style={'backgroundColor': 'transparent', 'borderRadius': '12px'})
 
+        # The browser keeps only a handle; period clicks read the cached bars server-side.
+        chart_handle = make_chart_handle(clicked_stock, bars, *history_window())
+
         stock_input_update = clicked_stock if trigger_source == 'search' else no_update
-        return stock_info, chart_container, stock_input_update, df.to_dict('records'), intraday_data, clicked_stock
+        return stock_info, chart_container, stock_input_update, chart_handle, intraday_data, clicked_stock
 
     # --- Period-button callback: filter data and update chart + badge ---
     # `stock-intraday-store` is also written by `update_stock_data`; declaring
@@ -1052,17 +1197,21 @@ def register_callbacks(dash_app):
          Output({'type': 'period-btn', 'index': ALL}, 'style'),
          Output({'type': 'period-badge', 'index': ALL}, 'children'),
          Output({'type': 'period-badge', 'index': ALL}, 'style'),
-         Output('stock-intraday-store', 'data', allow_duplicate=True)],
+         Output('stock-intraday-store', 'data', allow_duplicate=True),
+         Output('stock-intraday-mark', 'data'),
+         Output('intraday-interval', 'disabled'),
+         Output('stock-ohlcv-store', 'data', allow_duplicate=True)],
         Input({'type': 'period-btn', 'index': ALL}, 'n_clicks'),
         [State('stock-ohlcv-store', 'data'),
          State('stock-intraday-store', 'data'),
          State('stock-symbol-store', 'data'),
-         State({'type': 'period-btn', 'index': ALL}, 'id')],
+         State({'type': 'period-btn', 'index': ALL}, 'id'),
+         State('chart-width-store', 'data')],
         prevent_initial_call=True,
     )
-    def update_chart_period(n_clicks_list, stored_data, intraday_data, symbol, btn_ids):
+    def update_chart_period(n_clicks_list, chart_handle, intraday_data, symbol, btn_ids, chart_width):
         ctx = callback_context
-        if not ctx.triggered or not stored_data:
+        if not ctx.triggered or not chart_handle:
             raise dash.exceptions.PreventUpdate
 
         triggered_id = ctx.triggered_id
@@ -1071,17 +1220,30 @@ def register_callbacks(dash_app):
 
         active_period = triggered_id['index']
         intraday_update = no_update
+        mark_update = no_update
+        handle_update = no_update
         if active_period == '1D':
             if not intraday_data and symbol:
-                intraday_data = get_intraday_stock_data(symbol)
+                bars = get_intraday_stock_data(symbol)
+                intraday_data = bars.to_records()
                 intraday_update = intraday_data
+                mark_update = intraday_mark(bars)
             filtered_df = pd.DataFrame(intraday_data or [])
             pct_change = calculate_intraday_period_change(filtered_df)
         else:
-            df = pd.DataFrame(stored_data)
+            bars = get_chart_bars(chart_handle)
+            if bars is None:
+                # The history changed since the page loaded: chart the current
+                # bars and hand the browser a handle for them.
+                bars = get_stock_data(chart_handle['symbol'], chart_handle['from'], chart_handle['to'])
+                handle_update = make_chart_handle(
+                    chart_handle['symbol'], bars, chart_handle['from'], chart_handle['to'])
+            df = bars.to_frame()
             filtered_df = filter_data_for_period(df, active_period)
             pct_change = calculate_period_change(filtered_df)
-        fig = create_stock_chart_figure(filtered_df, symbol, period=active_period)
+            filtered_df = resample_for_period(filtered_df, active_period)
+        fig = create_stock_chart_figure(filtered_df, symbol, period=active_period,
+                                        max_points=chart_point_budget(chart_width))
 
         btn_styles = []
         badge_children_list = []
@@ -1098,7 +1260,43 @@ def register_callbacks(dash_app):
             badge_children_list.append(children)
             badge_styles.append(style)
 
-        return fig, btn_styles, badge_children_list, badge_styles, intraday_update
+        live = active_period == '1D' and is_market_open()
+        return (fig, btn_styles, badge_children_list, badge_styles, intraday_update, mark_update, not live,
+                handle_update)
+
+    # --- Live 1D refresh: patch new bars into the intraday store and chart ---
+    @dash_app.callback(
+        [Output('stock-intraday-store', 'data', allow_duplicate=True),
+         Output('stock-intraday-mark', 'data', allow_duplicate=True),
+         Output('stock-chart', 'figure', allow_duplicate=True),
+         Output({'type': 'period-badge', 'index': '1D'}, 'children', allow_duplicate=True),
+         Output({'type': 'period-badge', 'index': '1D'}, 'style', allow_duplicate=True),
+         Output('intraday-interval', 'disabled', allow_duplicate=True)],
+        Input('intraday-interval', 'n_intervals'),
+        [State('stock-intraday-mark', 'data'),
+         State('stock-symbol-store', 'data'),
+         State('chart-width-store', 'data')],
+        prevent_initial_call=True,
+    )
+    def refresh_intraday(n_intervals, mark, symbol, chart_width):
+        if not symbol:
+            raise dash.exceptions.PreventUpdate
+        bars = get_intraday_stock_data(symbol)
+        delta = intraday_delta(bars, mark)
+        live = is_market_open()
+        if delta is None:
+            if live:
+                raise dash.exceptions.PreventUpdate
+            return no_update, no_update, no_update, no_update, no_update, True
+
+        # Only a full replacement redraws the chart; otherwise extend it in place.
+        df = bars.to_frame()
+        max_points = chart_point_budget(chart_width)
+        fig = None if isinstance(delta, list) else intraday_figure_patch(bars, mark, max_points)
+        if fig is None:
+            fig = create_stock_chart_figure(df, symbol, period='1D', max_points=max_points)
+        badge_children, badge_style = _period_badge(calculate_intraday_period_change(df))
+        return delta, intraday_mark(bars), fig, badge_children, badge_style, not live
 
 
 def create_new_stock(stock_symbol):
@@ -1292,13 +1490,20 @@ def create_watchlist_content(watchlist):
         'overflow': 'hidden'
     })
 
+def history_window():
+    """(start_date, end_date) of the daily history behind the chart: the last 10 years."""
+    now = datetime.now()
+    return (now - timedelta(days=365 * 10)).strftime('%Y-%m-%d'), now.strftime('%Y-%m-%d')
+
+
 def fetch_and_display_stock_data(stock_symbol):
     try:
         # Fetch up to 10 years of daily OHLCV data so all period buttons
-        # (1D through MAX) can slice from the same dataset.
-        end_date = datetime.now().strftime('%Y-%m-%d')
-        start_date = (datetime.now() - timedelta(days=365 * 10)).strftime('%Y-%m-%d')
-        historical_data = get_stock_data(stock_symbol, start_date, end_date)
+        # (1D through MAX) can slice from the same dataset. Price and company
+        # details are fetched alongside it in parallel.
+        start_date, end_date = history_window()
+        bundle = get_quote_bundle(stock_symbol, start_date, end_date)
+        historical_data = bundle.history
 
         if not historical_data:
             return html.Div(
@@ -1314,14 +1519,13 @@ def fetch_and_display_stock_data(stock_symbol):
                     ),
                 ],
                 className="alert alert-warning m-3 p-3",
-            ), pd.DataFrame()
+            ), BarSeries.empty()
 
-        # Convert to DataFrame
-        df = pd.DataFrame(historical_data)
+        # Convert to DataFrame (OHLCV columns share the cached arrays)
+        df = historical_data.to_frame()
 
         if 'close' in df.columns:
-            # Get current price from service function
-            current_price = get_stock_price(stock_symbol)
+            current_price = bundle.price
 
             # Ensure we have a valid current price
             if current_price is None and not df.empty:
@@ -1346,8 +1550,7 @@ def fetch_and_display_stock_data(stock_symbol):
                 else:
                     change_str = "0.00%"
 
-            # Get company details
-            company_details = get_company_details(stock_symbol)
+            company_details = bundle.details
             company_name = company_details.get('name', stock_symbol) if company_details else stock_symbol
 
             # Get company logo
@@ -1417,6 +1620,12 @@ def fetch_and_display_stock_data(stock_symbol):
                 price_change_style['color'] = COLORS['text_muted']
                 arrow = ""
 
+            # With streaming on, assets/live_quotes.js keeps spans tagged
+            # `live-price` updated from /stock/api/stream.
+            live_price_props = (
+                {'className': 'live-price', 'data-symbol': stock_symbol} if quote_stream.enabled else {}
+            )
+
             # Create dark glassmorphism layout
             stock_info = html.Div([
                 # Company Header Card with dark styling
@@ -1540,7 +1749,7 @@ def fetch_and_display_stock_data(stock_symbol):
                                     'color': COLORS['text'],
                                     'marginRight': '10px',
                                     'fontFamily': "'Monaco', 'Courier New', monospace"
-                                }),
+                                }, **live_price_props),
                                 html.Span([
                                     html.Span(f"{arrow} ", style={'fontSize': '0.75rem'}),
                                     html.Span(f"{dollar_change:+.2f} ({change_str})")
@@ -1693,9 +1902,9 @@ def fetch_and_display_stock_data(stock_symbol):
                 })
             ])
 
-            return stock_info, df
+            return stock_info, historical_data
         else:
-            return html.Div(f"Insufficient data for {stock_symbol}", className="alert alert-warning m-3 p-3"), pd.DataFrame()
+            return html.Div(f"Insufficient data for {stock_symbol}", className="alert alert-warning m-3 p-3"), BarSeries.empty()
 
     except Exception as e:
         logger.error(f"Error fetching stock data: {str(e)}")
@@ -1721,5 +1930,5 @@ def fetch_and_display_stock_data(stock_symbol):
             'border': f'1px solid rgba(248, 113, 113, 0.3)',
             'backgroundColor': 'rgba(248, 113, 113, 0.1)',
             'borderLeft': f'4px solid {COLORS["negative"]}'
-        }), pd.DataFrame()
+        }), BarSeries.empty()
 
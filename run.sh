@@ -10,12 +10,12 @@ export PORT=${PORT:-8080}
 
 # Try different startup methods
 echo "Attempting to start with wsgi.py..."
-gunicorn --bind 0.0.0.0:$PORT wsgi:app --log-level info --timeout 120 --workers 1
+gunicorn --bind 0.0.0.0:$PORT wsgi:app --log-level info --timeout 120 --workers 1 --threads 8
 
 # If that fails, try app.py
 if [ $? -ne 0 ]; then
     echo "wsgi.py failed, trying app.py..."
-    gunicorn --bind 0.0.0.0:$PORT app:app --log-level info --timeout 120 --workers 1
+    gunicorn --bind 0.0.0.0:$PORT app:app --log-level info --timeout 120 --workers 1 --threads 8
 fi
 
 # If both fail, run a simple test
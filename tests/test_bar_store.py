@@ -0,0 +1,109 @@
+import time
+import numpy as np
+from unittest.mock import Mock, patch
+from app.utils.bar_store import BarStore, plan_missing_ranges
+from app.utils.bars import BarSeries, date_to_epoch_ms
+from app.services.stock_services import get_stock_data
+
+
+def _series(dates, closes=None):
+    closes = closes or [1.0] * len(dates)
+    return BarSeries([date_to_epoch_ms(d) for d in dates], closes, closes, closes, closes,
+                     [100.0] * len(dates))
+
+
+def _entry(start, end, dates, fetched_at=None):
+    return {
+        'start': start,
+        'end': end,
+        'bars': _series(dates),
+        'fetched_at': time.time() if fetched_at is None else fetched_at,
+    }
+
+
+def test_plan_full_range_when_store_empty():
+    assert plan_missing_ranges(None, "2024-01-01", "2024-01-31") == [("2024-01-01", "2024-01-31")]
+
+
+def test_plan_head_and_tail_gaps():
+    entry = _entry("2024-01-10", "2024-01-20", ["2024-01-10", "2024-01-19"])
+    ranges = plan_missing_ranges(entry, "2024-01-01", "2024-01-31")
+    assert ranges == [("2024-01-01", "2024-01-09"), ("2024-01-20", "2024-01-31")]
+
+
+def test_plan_nothing_for_fresh_covered_window():
+    entry = _entry("2024-01-01", "2024-01-31", ["2024-01-02", "2024-01-31"])
+    assert plan_missing_ranges(entry, "2024-01-05", "2024-01-31") == []
+
+
+def test_plan_refreshes_stale_tail():
+    entry = _entry("2024-01-01", "2024-01-31", ["2024-01-02", "2024-01-30"], fetched_at=0)
+    assert plan_missing_ranges(entry, "2024-01-05", "2024-01-31") == [("2024-01-30", "2024-01-31")]
+
+
+def _agg(date_str, close):
+    agg = Mock()
+    agg.timestamp = int(time.mktime(time.strptime(date_str + " 12:00", "%Y-%m-%d %H:%M")) * 1000)
+    agg.open = agg.high = agg.low = agg.close = close
+    agg.volume = 100
+    return agg
+
+
+@patch('app.services.stock_services.polygon_client')
+def test_get_stock_data_fetches_only_missing_tail(mock_polygon, app, test_cache):
+    with app.app_context():
+        mock_polygon.get_aggs.return_value = [_agg("2024-01-02", 1.0), _agg("2024-01-03", 2.0)]
+        assert len(get_stock_data("AAPL", "2024-01-01", "2024-01-03")) == 2
+
+        mock_polygon.get_aggs.return_value = [_agg("2024-01-03", 2.5), _agg("2024-01-04", 3.0)]
+        data = get_stock_data("AAPL", "2024-01-01", "2024-01-04")
+
+        last_call = mock_polygon.get_aggs.call_args[1]
+        assert (last_call['from_'], last_call['to']) == ("2024-01-03", "2024-01-04")
+        assert [bar['close'] for bar in data] == [1.0, 2.5, 3.0]
+
+
+def test_bar_store_refetches_whole_window_after_max_age(app, test_cache):
+    with app.app_context():
+        bar_store = BarStore(test_cache)
+        entry = bar_store.merge("AAPL", None, "2024-01-01", "2024-01-03",
+                                _series(["2024-01-02", "2024-01-03"], [100.0, 102.0]))
+        entry['created_at'] -= 8 * 86400
+        bar_store.store.set_value(bar_store._get_store_key("AAPL"), entry, timeout=0)
+
+        entry = bar_store.load("AAPL")
+        assert entry is None
+        assert bar_store.plan_missing_ranges(entry, "2024-01-01", "2024-01-03") == [("2024-01-01", "2024-01-03")]
+
+        # A 2:1 split since: the re-fetched window replaces the unadjusted bars.
+        bar_store.merge("AAPL", entry, "2024-01-01", "2024-01-03",
+                        _series(["2024-01-02", "2024-01-03"], [50.0, 51.0]))
+        entry = bar_store.load("AAPL")
+        assert [bar['close'] for bar in entry['bars']] == [50.0, 51.0]
+        assert time.time() - entry['created_at'] < 60
+
+def test_bar_series_slices_merges_and_converts():
+    series = _series(["2024-01-02", "2024-01-03", "2024-01-04"], [1.0, 2.0, 3.0])
+    merged = series.merge(_series(["2024-01-04", "2024-01-05"], [3.5, 4.0]))
+
+    assert [bar['close'] for bar in merged] == [1.0, 2.0, 3.5, 4.0]
+    assert merged.between("2024-01-03", "2024-01-04").to_records() == [
+        {'date': "2024-01-03", 'open': 2.0, 'high': 2.0, 'low': 2.0, 'close': 2.0, 'volume': 100.0},
+        {'date': "2024-01-04", 'open': 3.5, 'high': 3.5, 'low': 3.5, 'close': 3.5, 'volume': 100.0},
+    ]
+    frame = merged.to_frame()
+    assert list(frame['date']) == ["2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"]
+    assert np.shares_memory(frame['close'].to_numpy(), merged.close)
+
+
+def test_plan_skips_tail_after_close_until_next_session():
+    from datetime import datetime
+    from app.utils.bars import EASTERN_TZ
+
+    fetched = datetime(2024, 3, 8, 16, 30, tzinfo=EASTERN_TZ).timestamp()   # Friday after close
+    saturday = datetime(2024, 3, 9, 12, 0, tzinfo=EASTERN_TZ).timestamp()
+    monday = datetime(2024, 3, 11, 10, 0, tzinfo=EASTERN_TZ).timestamp()
+    entry = _entry("2023-03-08", "2024-03-08", ["2024-03-07", "2024-03-08"], fetched_at=fetched)
+
+    assert plan_missing_ranges(entry, "2023-03-09", "2024-03-09", now=saturday) == []
+    assert plan_missing_ranges(entry, "2023-03-11", "2024-03-11", now=monday) == [("2024-03-08", "2024-03-11")]
@@ -51,15 +51,38 @@ def test_cache_get_set(stock_cache, mock_cache):
 
 def test_cache_timeouts(stock_cache, mock_cache):
     """Test different cache timeouts for different data types."""
+    from app.utils.market_calendar import EASTERN_TZ
+
     test_data = {"price": 150.0}
+    in_session = datetime(2024, 3, 12, 11, 0, tzinfo=EASTERN_TZ)  # Tuesday 11:00 ET
 
-    # Test price cache timeout
-    stock_cache.set_cached_data("AAPL", "price", test_data)
-    assert mock_cache.set.call_args[1]['timeout'] == 300  # 5 minutes
+    with patch('app.utils.cache_manager.market_now', return_value=in_session):
+        # Test price cache timeout
+        # The last close cannot change before this session closes (16:00 ET)
+        stock_cache.set_cached_data("AAPL", "price", test_data)
+        assert mock_cache.set.call_args[1]['timeout'] == 5 * 3600
+
+        stock_cache.set_cached_data("AAPL", "intraday", test_data)
+        assert mock_cache.set.call_args[1]['timeout'] == 300  # 5 minutes
+
+        # Test details cache timeout
+        stock_cache.set_cached_data("AAPL", "details", test_data)
+        assert mock_cache.set.call_args[1]['timeout'] == 86400  # 24 hours
+
+def test_cache_timeouts_follow_trading_session(stock_cache, mock_cache):
+    """Off-hours entries last until the next open; completed windows are immutable."""
+    from app.utils.cache_manager import IMMUTABLE_TIMEOUT
+    from app.utils.market_calendar import EASTERN_TZ
 
-    # Test details cache timeout
-    stock_cache.set_cached_data("AAPL", "details", test_data)
-    assert mock_cache.set.call_args[1]['timeout'] == 86400  # 24 hours
+    friday_evening = datetime(2024, 3, 8, 17, 0, tzinfo=EASTERN_TZ)
+    with patch('app.utils.cache_manager.market_now', return_value=friday_evening):
+        stock_cache.set_cached_data("AAPL", "price", 150.0)
+        # Until Monday 09:30 ET: 2 days 16.5 hours
+        assert mock_cache.set.call_args[1]['timeout'] == (2 * 24 + 16.5) * 3600
+
+        stock_cache.set_cached_data("AAPL", "historical", [],
+                                    start_date="2024-01-01", end_date="2024-03-07")
+        assert mock_cache.set.call_args_list[-2][1]['timeout'] == IMMUTABLE_TIMEOUT
 
 @patch('app.services.stock_services.polygon_client')
 def test_historical_data_handling(mock_polygon, app, test_cache):
@@ -115,4 +138,300 @@ def test_cache_cli_command(app):
     with patch('app.utils.cache_monitor.test_cache_functionality') as mock_test_cache:
         result = runner.invoke(test_cache, ['AAPL'])
         assert result.exit_code == 0
-        mock_test_cache.assert_called_once_with('AAPL')
\ No newline at end of file
+        mock_test_cache.assert_called_once_with('AAPL')
+
+def test_cache_cli_command_uses_a_scratch_key(app, test_cache):
+    """The round-trip check never writes into a real data key."""
+    from app.cli import test_cache as test_cache_command
+
+    result = app.test_cli_runner().invoke(test_cache_command, ['AAPL'])
+    assert "Cache test completed for AAPL" in result.output
+    with app.app_context():
+        assert test_cache.get("stock:AAPL:price") is None
+        assert test_cache.get("cache-test:AAPL") is None
+
+def test_historical_range_subsumption():
+    """A window inside a cached historical window is answered by slicing it."""
+    from cachelib import SimpleCache
+
+    stock_cache = StockCache(SimpleCache())
+    bars = [{'date': f"2024-01-{day:02d}", 'close': float(day)} for day in range(2, 31)]
+    stock_cache.set_cached_data("AAPL", "historical", bars,
+                                start_date="2024-01-01", end_date="2024-01-31")
+
+    sliced = stock_cache.get_cached_data("AAPL", "historical",
+                                         start_date="2024-01-10", end_date="2024-01-31")
+    assert [bar['close'] for bar in sliced] == [float(day) for day in range(10, 31)]
+    assert stock_cache.get_cached_data("AAPL", "historical",
+                                       start_date="2023-12-01", end_date="2024-01-31") is None
+
+    # A covered window is not stored again; a superset replaces the cached window.
+    stock_cache.set_cached_data("AAPL", "historical", sliced,
+                                start_date="2024-01-10", end_date="2024-01-31")
+    assert stock_cache.cache.get(stock_cache._get_cache_key(
+        "AAPL", "historical", start_date="2024-01-10", end_date="2024-01-31")) is None
+    stock_cache.set_cached_data("AAPL", "historical", bars,
+                                start_date="2023-12-01", end_date="2024-01-31")
+    assert stock_cache.cache.get("stock:AAPL:historical:ranges") == [("2023-12-01", "2024-01-31")]
+
+def test_expired_range_window_is_stored_again():
+    """An expired window no longer blocks storing (and reading) the same window."""
+    from cachelib import SimpleCache
+
+    stock_cache = StockCache(SimpleCache())
+    bars = [{'date': f"2024-01-{day:02d}", 'close': float(day)} for day in range(2, 31)]
+    window = {'start_date': "2024-01-01", 'end_date': "2024-01-31"}
+    stock_cache.set_cached_data("AAPL", "historical", bars, **window)
+
+    # The window's TTL runs out while the (longer-lived) index still lists it.
+    stock_cache.cache.delete(stock_cache._get_cache_key("AAPL", "historical", **window))
+    assert stock_cache.get_cached_data("AAPL", "historical", **window) is None
+    assert stock_cache.cache.get("stock:AAPL:historical:ranges") == []
+
+    stock_cache.set_cached_data("AAPL", "historical", bars, **window)
+    assert stock_cache.get_cached_data("AAPL", "historical", **window) == bars
+
+    # Reads never probe the other listed windows.
+    with patch.object(stock_cache.cache, 'has', wraps=stock_cache.cache.has) as has:
+        stock_cache.get_cached_data("AAPL", "historical", start_date="2024-01-05", end_date="2024-01-20")
+    has.assert_not_called()
+
+@patch('app.services.stock_services.polygon_client')
+def test_history_is_cached_once_in_the_bar_store(mock_polygon, app, test_cache):
+    """get_stock_data keeps no per-window copies next to the BarStore."""
+    mock_result = Mock(open=1.0, high=1.0, low=1.0, close=1.0, volume=100,
+                       timestamp=int(datetime(2024, 1, 3, 12).timestamp() * 1000))
+    mock_polygon.get_aggs.return_value = [mock_result]
+    with app.app_context():
+        assert len(get_stock_data("AAPL", "2024-01-01", "2024-01-05")) == 1
+        assert len(get_stock_data("AAPL", "2024-01-02", "2024-01-04")) == 1
+        assert mock_polygon.get_aggs.call_count == 1
+        keys = list(test_cache.cache._cache)
+    assert not [key for key in keys if key.startswith("stock:AAPL:historical")]
+
+def test_get_or_fetch_coalesces_concurrent_misses():
+    """Concurrent misses for one key share a single upstream fetch."""
+    import threading
+    from cachelib import SimpleCache
+
+    stock_cache = StockCache(SimpleCache())
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetcher():
+        calls.append(1)
+        started.set()
+        release.wait(timeout=5)
+        return 150.0
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(
+            stock_cache.get_or_fetch("AAPL", "price", fetcher)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    started.wait(timeout=5)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert len(calls) == 1
+    assert results == [150.0] * 5
+    assert stock_cache.get_cached_data("AAPL", "price") == 150.0
+
+def test_stale_entries_are_served_while_refreshing():
+    """Past the fresh TTL the stale value is returned and refreshed in the background."""
+    import time
+    from cachelib import SimpleCache
+    from app.utils.cache_manager import CacheEntry, _inflight
+
+    stock_cache = StockCache(SimpleCache())
+    prices = iter([150.0, 151.0])
+    assert stock_cache.get_or_fetch("AAPL", "price", lambda: next(prices)) == 150.0
+
+    key = stock_cache._get_cache_key("AAPL", "price")
+    stock_cache.cache.set(key, CacheEntry(150.0, time.time() - 1))
+    assert stock_cache.get_or_fetch("AAPL", "price", lambda: next(prices)) == 150.0
+
+    deadline = time.time() + 5
+    while stock_cache.get_cached_data("AAPL", "price") != 151.0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert stock_cache.get_cached_data("AAPL", "price") == 151.0
+    assert not _inflight.in_flight(key)
+
+def test_failed_refresh_is_not_retried_on_every_stale_read():
+    """While a background refresh failure is negatively cached, stale reads do not refetch."""
+    import time
+    from cachelib import SimpleCache
+    from app.utils.cache_manager import CacheEntry, _inflight
+
+    stock_cache = StockCache(SimpleCache())
+    key = stock_cache._get_cache_key("AAPL", "price")
+    stock_cache.cache.set(key, CacheEntry(150.0, time.time() - 1))
+    failing = Mock(side_effect=RuntimeError("timeout"))
+
+    assert stock_cache.get_or_fetch("AAPL", "price", failing) == 150.0
+    deadline = time.time() + 5
+    while stock_cache.get_negative("AAPL", "price") is None and time.time() < deadline:
+        time.sleep(0.01)
+    while _inflight.in_flight(key) and time.time() < deadline:
+        time.sleep(0.01)
+
+    for _ in range(3):
+        assert stock_cache.get_or_fetch("AAPL", "price", failing) == 150.0
+    time.sleep(0.05)
+    assert failing.call_count == 1
+
+def test_failed_lookups_are_negatively_cached():
+    """Unknown symbols and errors are remembered so retries skip the fetcher."""
+    from cachelib import SimpleCache
+    from app.utils.cache_manager import NEGATIVE_TIMEOUTS, SymbolNotFound
+    from app.utils.cache_monitor import metrics
+
+    stock_cache = StockCache(SimpleCache())
+    calls = []
+
+    def unknown():
+        calls.append(1)
+        raise SymbolNotFound("NOT_FOUND")
+
+    with pytest.raises(SymbolNotFound):
+        stock_cache.get_or_fetch("ZZZZ", "details", unknown)
+    before = metrics.negative_hits[("details", "not_found")]
+    assert stock_cache.get_or_fetch("ZZZZ", "details", unknown) is None
+    assert len(calls) == 1
+    assert metrics.negative_hits[("details", "not_found")] == before + 1
+
+    mock_cache = Mock(spec=Cache)
+    mock_cache.get.return_value = None
+    with pytest.raises(RuntimeError):
+        StockCache(mock_cache).get_or_fetch("AAPL", "details", Mock(side_effect=RuntimeError("timeout")))
+    mock_cache.set.assert_called_with(
+        "stock:AAPL:details:negative", "error", timeout=NEGATIVE_TIMEOUTS['error']
+    )
+
+@patch('app.services.stock_services.polygon_client')
+def test_only_ticker_details_404_means_unknown_symbol(mock_polygon, app):
+    """An open-close NOT_FOUND (no bar yet) is a short 'empty' miss, not a day-long 'not_found'."""
+    from app.extensions import cache
+
+    mock_polygon.get_daily_open_close_agg.side_effect = Exception('{"status":"NOT_FOUND","message":"Data not found."}')
+    mock_polygon.get_ticker_details.side_effect = Exception('{"status":"NOT_FOUND","message":"Ticker not found."}')
+    with app.app_context():
+        stock_cache = StockCache(cache)
+        assert get_stock_price("AAPL") is None
+        assert stock_cache.get_negative("AAPL", "price") == "empty"
+        assert get_company_details("ZZZZ") is None
+        assert stock_cache.get_negative("ZZZZ", "details") == "not_found"
+
+def test_packed_serializer_round_trips_and_chunks_large_values():
+    """Packed values are much smaller than pickled records and survive chunking."""
+    import pickle
+    import numpy as np
+    from cachelib import SimpleCache
+    from app.utils.bars import BarSeries
+    from app.utils.cache_manager import CacheEntry
+    from app.utils.cache_serializer import ChunkManifest, PackedSerializer
+
+    days = 2520
+    close = 100 + np.cumsum(np.round(np.random.default_rng(0).normal(0, 1, days), 2))
+    bars = BarSeries(1_104_555_600_000 + np.arange(days) * 86_400_000,
+                     close, close + 1, close - 1, close, np.full(days, 1e6))
+    serializer = PackedSerializer()
+
+    packed = serializer.dumps(bars)
+    assert serializer.loads(packed) == bars
+    assert len(packed) < len(pickle.dumps(bars.to_records())) / 5
+    assert serializer.loads(serializer.dumps(CacheEntry(bars, 1.0))).value == bars
+    assert serializer.loads(150.0) == 150.0  # written before the serializer was enabled
+
+    backend = SimpleCache()
+    stock_cache = StockCache(backend, serializer=serializer, max_value_bytes=4096)
+    stock_cache.set_value("stock:AAPL:bars", {'bars': bars}, timeout=0)
+    manifest = backend.get("stock:AAPL:bars")
+    assert isinstance(manifest, ChunkManifest) and manifest.count > 1
+    assert stock_cache.get_value("stock:AAPL:bars")['bars'] == bars
+
+    # Rewriting drops the old chunks; a missing chunk reads as a miss.
+    stock_cache.set_value("stock:AAPL:bars", {'bars': bars[:-1]}, timeout=0)
+    assert backend.get(f"stock:AAPL:bars:chunk:{manifest.token}:0") is None
+    backend.delete(f"stock:AAPL:bars:chunk:{backend.get('stock:AAPL:bars').token}:0")
+    assert stock_cache.get_value("stock:AAPL:bars") is None
+
+    # A write reads only the small manifest marker, not the previous value.
+    stock_cache.set_value("stock:AAPL:bars", {'bars': bars}, timeout=0)
+    manifest = backend.get("stock:AAPL:bars:manifest")
+    with patch.object(backend, 'get', wraps=backend.get) as get:
+        stock_cache.set_value("stock:AAPL:bars", {'bars': bars[:3]}, timeout=0)
+    assert [c.args for c in get.call_args_list] == [("stock:AAPL:bars:manifest",)]
+    assert backend.get("stock:AAPL:bars:manifest") is None
+    assert backend.get(f"stock:AAPL:bars:chunk:{manifest.token}:0") is None
+    assert stock_cache.get_value("stock:AAPL:bars")['bars'] == bars[:3]
+
+def test_local_tier_serves_hot_reads_and_sees_other_workers_writes():
+    """L1 hits skip the backend; a newer version written elsewhere replaces them."""
+    from cachelib import SimpleCache
+    from app.utils.local_tier import LocalTier
+
+    backend = SimpleCache()
+    worker_a = StockCache(backend, local=LocalTier(ttl=60))
+    worker_b = StockCache(backend, local=LocalTier(ttl=0))
+    worker_a.set_value("stock:AAPL:price", 150.0, timeout=300)
+    assert worker_b.get_value("stock:AAPL:price") == 150.0
+
+    backend_get = Mock(wraps=backend.get)
+    backend_get_many = Mock(wraps=backend.get_many)
+    with patch.object(backend, 'get', backend_get), patch.object(backend, 'get_many', backend_get_many):
+        assert worker_a.get_value("stock:AAPL:price") == 150.0
+        backend_get.assert_not_called()
+
+        # Past its L1 TTL, an unchanged entry costs one small version lookup.
+        assert worker_b.get_value("stock:AAPL:price") == 150.0
+        backend_get.assert_called_once_with("stock:AAPL:price:version")
+        backend_get_many.assert_not_called()
+
+    worker_a.set_value("stock:AAPL:price", 151.0, timeout=300)
+    assert worker_b.get_value("stock:AAPL:price") == 151.0
+
+    worker_a.delete_value("stock:AAPL:price")
+    assert worker_a.get_value("stock:AAPL:price") is None
+    assert worker_b.get_value("stock:AAPL:price") is None
+
+def test_local_tier_is_bounded_by_entries_and_bytes():
+    from app.utils.local_tier import LocalTier
+
+    tier = LocalTier(max_entries=2, max_bytes=10_000)
+    tier.put("a", 1.0, "v")
+    tier.put("b", 2.0, "v")
+    tier.get("a")
+    tier.put("c", 3.0, "v")
+    assert tier.get("b") is None and tier.get("a").value == 1.0
+
+    tier.put("big", "x" * 9_940, "v")
+    assert len(tier) == 1 and tier.nbytes <= 10_000
+    tier.put("huge", "x" * 20_000, "v")
+    assert tier.get("huge") is None
+
+def test_metrics_endpoint_reports_hits_misses_and_latency(app, client, test_cache):
+    """Cache reads and writes show up per data type in Prometheus format."""
+    from app.utils.cache_monitor import metrics
+
+    metrics.reset()
+    with app.app_context():
+        stock_cache = StockCache(test_cache)
+        assert stock_cache.get_cached_data("AAPL", "price") is None
+        stock_cache.set_cached_data("AAPL", "price", 150.0)
+        assert stock_cache.get_cached_data("AAPL", "price") == 150.0
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    body = response.get_data(as_text=True)
+    assert 'stock_cache_hits_total{data_type="price",backend="SimpleCache"} 1' in body
+    assert 'stock_cache_misses_total{data_type="price",backend="SimpleCache"} 1' in body
+    assert 'stock_cache_sets_total{data_type="price",backend="SimpleCache"} 1' in body
+    assert 'stock_cache_get_duration_seconds_count{data_type="price",backend="SimpleCache"} 2' in body
+    assert 'stock_cache_get_duration_seconds_bucket{data_type="price",backend="SimpleCache",le="+Inf"} 2' in body
@@ -0,0 +1,51 @@
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+from app.extensions import db
+from app.models import Stock, Watchlist
+from app.services.cache_warmer import next_warm_time, warm_cache
+from app.services.stock_services import get_tracked_symbols
+from app.utils.market_calendar import EASTERN_TZ
+
+
+def _watch(user_id, name, symbols):
+    watchlist = Watchlist(name=name, user_id=user_id)
+    for symbol in symbols:
+        stock = Stock.query.filter_by(symbol=symbol).first() or Stock(symbol=symbol, name=symbol)
+        watchlist.stocks.append(stock)
+    db.session.add(watchlist)
+
+
+def test_tracked_symbols_are_ranked_by_watchlist_count(app):
+    with app.app_context():
+        _watch(1, "a", ["MSFT", "AAPL"])
+        _watch(1, "b", ["AAPL", "TSLA"])
+        _watch(2, "c", ["AAPL", "TSLA"])
+        db.session.commit()
+        assert get_tracked_symbols() == ["AAPL", "TSLA", "MSFT"]
+
+
+@patch('app.services.stock_services.polygon_client')
+def test_warm_cache_prefetches_details_history_and_price(mock_polygon, app, test_cache):
+    grouped = Mock(ticker="AAPL", close=150.0)
+    mock_polygon.get_grouped_daily_aggs.return_value = [grouped]
+    details = Mock(market_cap=1.0)
+    details.name = "Apple Inc."
+    mock_polygon.get_ticker_details.return_value = details
+    bar = Mock(timestamp=1704205200000, open=1.0, high=1.0, low=1.0, close=1.0, volume=10)
+    mock_polygon.get_aggs.return_value = [bar]
+
+    with app.app_context():
+        assert warm_cache(["AAPL"]) == {"AAPL": True}
+        mock_polygon.get_ticker_details.reset_mock()
+        from app.services.stock_services import get_company_details, get_stock_price
+        assert get_stock_price("AAPL") == 150.0
+        assert get_company_details("AAPL") is not None
+        mock_polygon.get_ticker_details.assert_not_called()
+
+
+def test_next_warm_time_targets_pre_open_and_post_close():
+    friday_noon = datetime(2024, 3, 8, 12, 0, tzinfo=EASTERN_TZ)
+    friday_evening = datetime(2024, 3, 8, 17, 0, tzinfo=EASTERN_TZ)
+    assert next_warm_time(friday_noon) == datetime(2024, 3, 8, 16, 15, tzinfo=EASTERN_TZ)
+    assert next_warm_time(friday_evening) == datetime(2024, 3, 11, 9, 0, tzinfo=EASTERN_TZ)
@@ -0,0 +1,33 @@
+import json
+from unittest.mock import patch
+
+from app.services.chart_store import data_version, get_chart_bars, make_chart_handle
+from app.utils.bars import BarSeries, date_to_epoch_ms
+
+
+def _bars(closes):
+    return BarSeries([date_to_epoch_ms("2014-03-04", days=i) for i in range(len(closes))],
+                     closes, closes, closes, closes,
+                     [100.0] * len(closes))
+
+
+def test_handle_is_small_and_resolves_to_cached_history(app):
+    bars = _bars([float(i) for i in range(2500)])
+    with app.app_context():
+        handle = make_chart_handle("AAPL", bars, "2014-03-04", "2024-03-04")
+        assert handle['version'] == data_version(bars) != data_version(_bars([1.0]))
+        assert len(json.dumps(handle)) < 200
+
+        with patch('app.services.chart_store.get_stock_data', return_value=bars) as get_stock_data:
+            assert get_chart_bars(handle) == bars
+        get_stock_data.assert_called_once_with("AAPL", "2014-03-04", "2024-03-04")
+        assert len(get_chart_bars(None)) == 0
+
+
+def test_outdated_handle_is_rejected(app):
+    issued = _bars([1.0, 2.0])
+    with app.app_context():
+        handle = make_chart_handle("AAPL", issued, "2014-03-04", "2014-03-06")
+        # A split re-adjusted the history after the page loaded.
+        with patch('app.services.chart_store.get_stock_data', return_value=_bars([0.5, 1.0])):
+            assert get_chart_bars(handle) is None
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from app.utils.downsample import lttb_indices, minmax_indices
+from frontend.dashboard import create_stock_chart_figure
+
+
+def test_lttb_keeps_endpoints_and_extremes_within_budget():
+    rng = np.random.default_rng(0)
+    y = np.cumsum(rng.normal(size=2500))
+    y[1234] = y.max() + 50      # a spike LTTB must not drop
+    x = np.arange(len(y), dtype=float)
+
+    indices = lttb_indices(x, y, 500)
+
+    assert len(indices) == 500
+    assert indices[0] == 0 and indices[-1] == len(y) - 1
+    assert np.all(np.diff(indices) > 0)
+    assert 1234 in indices
+    assert list(lttb_indices(x[:5], y[:5], 10)) == [0, 1, 2, 3, 4]
+
+
+def test_minmax_keeps_each_buckets_min_and_max():
+    volume = np.ones(1000)
+    volume[[10, 500]] = 100.0
+    volume[[20, 990]] = 0.0
+
+    indices = minmax_indices(volume, 100)
+
+    assert len(indices) <= 100
+    assert {10, 20, 500, 990} <= set(indices.tolist())
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_sampled_volume_bars_keep_their_full_frame_colours():
+    days = 1000
+    change = np.full(days, -0.01)
+    change[1::10] = 0.005                                     # small up days among a slide
+    close = 100 + np.cumsum(change)
+    volume = np.ones(days)
+    volume[1::10] = 50.0                                      # the up days have the spikes
+    df = pd.DataFrame({
+        'date': pd.date_range('2020-01-01', periods=days).strftime('%Y-%m-%d'),
+        'open': close, 'high': close, 'low': close, 'close': close, 'volume': volume,
+    })
+
+    fig = create_stock_chart_figure(df, 'AAPL', period='5Y', max_points=100)
+    bars = next(trace for trace in fig.data if trace.name == 'Volume')
+
+    assert len(bars.y) <= 100
+    # Each spike is up on its own day, though below the previous sampled bar.
+    assert {colour for y, colour in zip(bars.y, bars.marker.color) if y == 50.0} == {'rgba(74, 222, 128, 0.20)'}
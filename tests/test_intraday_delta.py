@@ -0,0 +1,88 @@
+import copy
+import json
+
+from dash._utils import to_json
+
+from app.utils.bars import BarSeries
+from frontend.dashboard import create_stock_chart_figure, intraday_delta, intraday_figure_patch, intraday_mark
+
+OPEN_MS = 1_704_810_600_000   # 2024-01-09 09:30 ET
+MINUTE_MS = 60_000
+
+
+def _minutes(closes, start=OPEN_MS):
+    return BarSeries([start + i * MINUTE_MS for i in range(len(closes))],
+                     closes, closes, closes, closes, [100.0] * len(closes), interval='1-minute')
+
+
+def _apply(data, patch):
+    """Apply a Patch's operations to ``data`` the way dash-renderer does."""
+    data = copy.deepcopy(data)
+    for op in patch.to_plotly_json()['operations']:
+        target = data
+        for part in op['location'][:-1]:
+            target = target[part]
+        if op['operation'] == 'Assign':
+            target[op['location'][-1]] = op['params']['value']
+        elif op['operation'] == 'Extend':
+            (target[op['location'][-1]] if op['location'] else target).extend(op['params']['value'])
+        else:
+            raise AssertionError(f"unexpected operation {op['operation']}")
+    return data
+
+
+def _figure(bars):
+    return json.loads(to_json(create_stock_chart_figure(bars.to_frame(), 'AAPL', period='1D', max_points=800)))
+
+
+def test_intraday_mark_summarizes_last_bar():
+    assert intraday_mark(BarSeries.empty(interval='1-minute')) is None
+    assert intraday_mark(_minutes([1.0, 2.0, 3.0])) == {
+        'first': OPEN_MS, 'last': OPEN_MS + 2 * MINUTE_MS, 'count': 3, 'close': 3.0, 'volume': 100.0,
+    }
+
+
+def test_intraday_delta_resends_last_bar_and_appends_by_index():
+    held = _minutes([1.0, 2.0, 3.0])
+    now = _minutes([1.0, 2.0, 3.5, 4.0, 5.0])   # last held bar was still forming
+
+    patch = intraday_delta(now, intraday_mark(held))
+    operations = patch.to_plotly_json()['operations']
+    assert operations[0]['location'] == [2]
+    assert [record['close'] for record in operations[1]['params']['value']] == [4.0, 5.0]
+    assert _apply(held.to_records(), patch) == now.to_records()
+
+
+def test_intraday_delta_is_none_when_nothing_changed():
+    bars = _minutes([1.0, 2.0, 3.0])
+    assert intraday_delta(bars, intraday_mark(bars)) is None
+
+
+def test_intraday_delta_resends_everything_for_a_new_session_or_missing_mark():
+    held = _minutes([1.0, 2.0, 3.0])
+    next_session = _minutes([7.0, 8.0], start=OPEN_MS + 86_400_000)
+    assert intraday_delta(next_session, intraday_mark(held)) == next_session.to_records()
+    assert intraday_delta(held[:2], intraday_mark(held)) == held[:2].to_records()   # fewer bars
+    assert intraday_delta(held, None) == held.to_records()
+
+
+def test_intraday_figure_patch_extends_traces_in_place():
+    held = _minutes([1.0, 2.0, 3.0])
+    now = _minutes([1.0, 2.0, 2.5, 4.0, 5.0])
+
+    patch = intraday_figure_patch(now, intraday_mark(held), 800)
+    patched, rebuilt = _apply(_figure(held), patch), _figure(now)
+    for trace in (0, 1):
+        assert patched['data'][trace]['x'] == rebuilt['data'][trace]['x']
+        assert patched['data'][trace]['y'] == rebuilt['data'][trace]['y']
+    assert patched['data'][1]['marker']['color'] == rebuilt['data'][1]['marker']['color']
+    assert patched['layout']['yaxis']['range'] == rebuilt['layout']['yaxis']['range']
+    assert len(json.dumps(patch.to_plotly_json())) < len(json.dumps(rebuilt)) / 2
+
+
+def test_intraday_figure_patch_rebuilds_for_new_session_or_downsampled_chart():
+    held = _minutes([1.0, 2.0, 3.0])
+    next_session = _minutes([7.0, 8.0], start=OPEN_MS + 86_400_000)
+    assert intraday_figure_patch(next_session, intraday_mark(held), 800) is None
+    assert intraday_figure_patch(_minutes([1.0] * 10), intraday_mark(held), 5) is None
+    assert intraday_figure_patch(held, None, 800) is None
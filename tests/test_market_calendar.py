@@ -0,0 +1,34 @@
+from datetime import date, datetime, time
+from app.utils.market_calendar import (
+    EASTERN_TZ,
+    is_market_open,
+    is_trading_day,
+    most_recent_completed_session,
+    next_session_open,
+    session_bounds,
+    session_close,
+)
+
+
+def test_nyse_holidays_are_not_trading_days():
+    assert not is_trading_day(date(2024, 3, 29))   # Good Friday
+    assert not is_trading_day(date(2024, 6, 19))   # Juneteenth
+    assert not is_trading_day(date(2026, 7, 3))    # Independence Day observed (Friday)
+    assert not is_trading_day(date(2022, 12, 26))  # Christmas observed (Monday)
+    assert is_trading_day(date(2021, 12, 31))      # New Year's on Saturday is not observed
+    assert is_trading_day(date(2024, 7, 5))
+
+
+def test_early_closes():
+    assert session_close(date(2024, 11, 29)).time() == time(13, 0)  # day after Thanksgiving
+    assert session_close(date(2024, 12, 24)).time() == time(13, 0)
+    assert session_close(date(2024, 12, 23)).time() == time(16, 0)
+    assert not is_market_open(datetime(2024, 11, 29, 14, 0, tzinfo=EASTERN_TZ))
+
+
+def test_session_lookups_skip_holidays():
+    after_thanksgiving = datetime(2024, 11, 28, 12, 0, tzinfo=EASTERN_TZ)
+    assert most_recent_completed_session(after_thanksgiving) == date(2024, 11, 27)
+    assert next_session_open(after_thanksgiving) == datetime(2024, 11, 29, 9, 30, tzinfo=EASTERN_TZ)
+    # Mar 28 (Thu) and Apr 1 (Mon) only: Good Friday and the weekend have no session.
+    assert len(session_bounds("2024-03-28", "2024-04-01")) == 2
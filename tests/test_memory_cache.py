@@ -0,0 +1,56 @@
+from unittest.mock import patch
+
+from flask import Flask
+from flask_caching import Cache
+
+from app.utils.memory_cache import BoundedMemoryCache
+
+
+def test_evicts_to_byte_budget_keeping_weighted_and_popular_entries():
+    cache = BoundedMemoryCache(max_bytes=10_000)
+    cache.set("stock:AAPL:details", "d" * 2_000)
+    cache.set("stock:AAPL:price", "p" * 2_000)
+    cache.set("stock:MSFT:price", "p" * 2_000)
+    cache.get("stock:AAPL:price")
+    cache.set("stock:TSLA:price", "p" * 2_000)
+
+    cache.set("stock:NVDA:price", "p" * 3_000)
+
+    assert cache.nbytes <= 10_000
+    assert not cache.has("stock:MSFT:price")  # least weighted, never read
+    assert cache.get("stock:AAPL:details") == "d" * 2_000
+    assert cache.get("stock:AAPL:price") == "p" * 2_000
+    assert not cache.set("stock:AAPL:bars", "b" * 20_000)
+
+
+def test_halves_budget_above_rss_watermark_and_keeps_accepting_writes():
+    cache = BoundedMemoryCache(max_bytes=10_000, rss_watermark=1_000)
+
+    def set_with_rss(rss, key, size):
+        cache._rss_checked_at = 0
+        with patch('app.utils.memory_cache.read_rss_bytes', return_value=rss):
+            return cache.set(key, "p" * size)
+
+    for symbol in ("AAPL", "MSFT", "TSLA"):
+        assert set_with_rss(0, f"stock:{symbol}:price", 3_000)
+
+    assert set_with_rss(2_000, "stock:NVDA:price", 100)
+    assert cache.nbytes <= 5_000 and cache.has("stock:NVDA:price")
+    # Too large for the smaller budget: refused, and the stored value is kept.
+    assert not set_with_rss(2_000, "stock:NVDA:price", 6_000)
+    assert cache.get("stock:NVDA:price") == "p" * 100
+
+    # RSS rarely drops back much; the cut lasts until it is well under the watermark.
+    assert not set_with_rss(950, "stock:AMD:price", 6_000)
+    assert set_with_rss(800, "stock:AMD:price", 6_000)
+
+
+def test_loads_through_flask_caching_import_path():
+    app = Flask(__name__)
+    app.config.update(CACHE_TYPE='app.utils.memory_cache.BoundedMemoryCache', CACHE_MAX_BYTES=4096)
+    cache = Cache(app)
+    with app.app_context():
+        assert isinstance(cache.cache, BoundedMemoryCache)
+        assert cache.cache.max_bytes == 4096
+        cache.set("stock:AAPL:price", 150.0)
+        assert cache.get("stock:AAPL:price") == 150.0
@@ -0,0 +1,48 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.utils.polygon_pool import PolygonClientPool, pool_stats
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{"status": "OK"}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_shared_client_reuses_kept_alive_connections_across_threads():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v3/reference/tickers/AAPL"
+
+    pool = PolygonClientPool(maxsize=4)
+    client = pool.client("test-key")
+    assert pool.client("test-key") is client
+    assert client.timeout.connect_timeout == 5.0
+
+    def fetch():
+        for _ in range(10):
+            assert client.client.request('GET', url).status == 200
+
+    threads = [threading.Thread(target=fetch) for _ in range(4)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+    finally:
+        server.shutdown()
+
+    [stats] = pool_stats(client.client)
+    assert stats['requests'] == 40
+    assert stats['connections_opened'] <= 4
+    assert 'polygon_http_requests_total{host="127.0.0.1"} 40' in pool.render_metrics()
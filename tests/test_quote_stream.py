@@ -0,0 +1,132 @@
+import json
+import time
+
+import pytest
+
+from app import create_app
+from app.extensions import db, quote_stream
+from app.services import stock_services
+from app.utils.quote_stream import QuoteTable, quote_from_message
+
+
+REPLAY = [
+    {'symbol': 'AAPL', 'price': 190.0, 'size': 100, 'timestamp': 1_700_000_000_000},
+    {'symbol': 'MSFT', 'price': 370.0, 'size': 50, 'timestamp': 1_700_000_000_500},
+    {'symbol': 'AAPL', 'price': 190.5, 'size': 10, 'timestamp': 1_700_000_001_000},
+]
+
+
+@pytest.fixture
+def streaming_app(tmp_path):
+    replay = tmp_path / 'quotes.jsonl'
+    replay.write_text("\n".join(json.dumps(message) for message in REPLAY))
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'CACHE_TYPE': 'SimpleCache',
+        'STREAMING_ENABLED': True,
+        'STREAM_REPLAY_FILE': str(replay),
+        'STREAM_REPLAY_INTERVAL': 0,
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+    quote_stream.stop()
+
+
+def _wait_for_replay():
+    deadline = time.monotonic() + 2
+    while quote_stream.latest('AAPL') is None or quote_stream.latest('AAPL').price != 190.5:
+        assert time.monotonic() < deadline, "replay feed did not deliver"
+        time.sleep(0.01)
+
+
+def _events(chunks, count):
+    events = []
+    for chunk in chunks:
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if chunk.startswith('event: quote'):
+            events.append(json.loads(chunk.split('data: ', 1)[1]))
+            if len(events) == count:
+                return events
+    return events
+
+
+def test_quote_table_pushes_only_subscribed_symbols():
+    table = QuoteTable()
+    subscription = table.subscribe(['AAPL'])
+    for message in REPLAY:
+        table.update(quote_from_message(message))
+    older = dict(REPLAY[0], price=189.0, timestamp=REPLAY[0]['timestamp'] - 1)
+    assert table.update(quote_from_message(older)) is False
+
+    quotes = subscription.wait(0)
+    assert [(q.symbol, q.price) for q in quotes] == [('AAPL', 190.5)]  # coalesced
+    assert subscription.wait(0) == []
+    assert table.latest('MSFT').price == 370.0
+    assert table.watched() == {'AAPL'}
+
+
+def test_stream_endpoint_sends_snapshot_then_updates(streaming_app):
+    _wait_for_replay()
+    client = streaming_app.test_client()
+    response = client.get('/stock/api/stream?symbols=aapl')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+
+    chunks = iter(response.response)
+    assert _events(chunks, 1) == [{'symbol': 'AAPL', 'price': 190.5, 'size': 10, 'timestamp': 1_700_000_001_000}]
+    assert quote_stream.table.watched() == {'AAPL'}
+
+    quote_stream.handle([{'symbol': 'MSFT', 'price': 371.0, 'timestamp': 1_700_000_002_000}])
+    quote_stream.handle([{'symbol': 'AAPL', 'price': 191.0, 'timestamp': 1_700_000_002_000}])
+    assert [e['price'] for e in _events(chunks, 1)] == [191.0]
+
+    response.close()
+    assert quote_stream.table.subscriber_count == 0
+
+
+def test_stream_endpoint_refuses_clients_above_cap(streaming_app, monkeypatch):
+    monkeypatch.setattr(quote_stream, 'max_clients', 1)
+    client = streaming_app.test_client()
+    first = client.get('/stock/api/stream?symbols=AAPL')
+    assert first.status_code == 200
+    assert client.get('/stock/api/stream?symbols=MSFT').status_code == 503
+    assert quote_stream.table.subscriber_count == 1
+
+    first.close()
+    assert quote_stream.table.subscriber_count == 0
+    second = client.get('/stock/api/stream?symbols=MSFT')
+    assert second.status_code == 200
+    second.close()
+
+
+def test_stream_endpoint_disabled_and_bad_requests(app, client):
+    assert client.get('/stock/api/stream?symbols=AAPL').status_code == 204
+
+    quote_stream.start(_NullFeed())
+    try:
+        assert client.get('/stock/api/stream').status_code == 400
+        too_many = ','.join(f"S{i}" for i in range(21))
+        assert client.get(f'/stock/api/stream?symbols={too_many}').status_code == 400
+    finally:
+        quote_stream.stop()
+
+
+def test_get_stock_price_prefers_fresh_live_quote(streaming_app, monkeypatch):
+    _wait_for_replay()
+    monkeypatch.setattr(stock_services, '_fetch_price', lambda symbol: pytest.fail('should not fetch'))
+    assert stock_services.get_stock_price('AAPL') == 190.5
+
+
+class _NullFeed:
+    def set_symbols(self, symbols):
+        pass
+
+    def run(self, handle, stop):
+        stop.wait()
+
+    def close(self):
+        pass
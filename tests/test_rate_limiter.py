@@ -0,0 +1,56 @@
+import threading
+import time
+import pytest
+from app.utils.rate_limiter import (
+    PolygonRateLimiter,
+    RateLimitTimeout,
+    PRIORITY_BACKFILL,
+    PRIORITY_INTERACTIVE,
+    request_priority,
+)
+
+
+def test_disabled_limiter_never_blocks():
+    limiter = PolygonRateLimiter(requests_per_minute=0)
+    for _ in range(100):
+        limiter.acquire(timeout=0)
+
+
+def test_bucket_allows_burst_then_times_out():
+    limiter = PolygonRateLimiter(requests_per_minute=5, burst=2)
+    limiter.acquire(timeout=0)
+    limiter.acquire(timeout=0)
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(timeout=0.05)
+
+
+def test_interactive_callers_go_before_backfill():
+    limiter = PolygonRateLimiter(requests_per_minute=600, burst=1)
+    limiter.acquire()
+    order = []
+
+    def worker(name, priority):
+        with request_priority(priority):
+            limiter.acquire(timeout=2)
+        order.append(name)
+
+    backfill = threading.Thread(target=worker, args=('backfill', PRIORITY_BACKFILL))
+    backfill.start()
+    time.sleep(0.02)
+    interactive = threading.Thread(target=worker, args=('interactive', PRIORITY_INTERACTIVE))
+    interactive.start()
+    backfill.join(timeout=3)
+    interactive.join(timeout=3)
+
+    assert order == ['interactive', 'backfill']
+
+
+def test_rate_limited_response_pauses_callers():
+    limiter = PolygonRateLimiter(requests_per_minute=600, base_cooldown=1.0)
+    limiter.record_rate_limited()
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(timeout=0.1)
+    assert limiter._rate_scale == 0.5
+
+    limiter.record_success()
+    assert limiter._rate_scale == 0.625
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+import numpy as np
+
+from app.utils.bars import EASTERN_TZ, BarSeries, date_to_epoch_ms
+from app.utils.resample import resample, resample_months, resample_weeks
+
+
+def test_resample_weeks_months_and_session_aligned_minutes():
+    # A full week, two days of the next one, then a day in April
+    dates = ["2024-02-26", "2024-02-27", "2024-02-28", "2024-02-29", "2024-03-01",
+             "2024-03-04", "2024-03-05", "2024-04-01"]
+    daily = BarSeries([date_to_epoch_ms(d) for d in dates], np.arange(8.0), np.arange(8.0) + 1,
+                      np.arange(8.0) - 1, np.arange(8.0) + 0.5, np.ones(8))
+
+    weekly = resample_weeks(daily).to_records()
+    assert [(r['date'], r['open'], r['high'], r['low'], r['close'], r['volume']) for r in weekly] == [
+        ("2024-02-26", 0.0, 5.0, -1.0, 4.5, 5.0),
+        ("2024-03-04", 5.0, 7.0, 4.0, 6.5, 2.0),
+        ("2024-04-01", 7.0, 8.0, 6.0, 7.5, 1.0),
+    ]
+    assert [r['date'] for r in resample_months(daily).to_records()] == ["2024-02-26", "2024-03-01", "2024-04-01"]
+
+    minutes = [int(datetime(2024, 3, 8, 9, 30 + i, tzinfo=EASTERN_TZ).timestamp() * 1000) for i in range(30)]
+    minute_bars = BarSeries(minutes, np.ones(30), np.ones(30), np.ones(30), np.ones(30), np.ones(30),
+                            interval="1-minute")
+    seven = resample(minute_bars, "7-minute").to_records()
+    assert [r['time'] for r in seven] == ["09:30", "09:37", "09:44", "09:51", "09:58"]
+    assert [r['volume'] for r in seven] == [7.0, 7.0, 7.0, 7.0, 2.0]
@@ -132,4 +132,218 @@ def test_database_constraints(app):
 
         # Clean up
         Stock.query.filter_by(symbol="AAPL").delete()
-        db.session.commit()
\ No newline at end of file
+        db.session.commit()
+
+@pytest.mark.integration
+def test_refresh_tracked_prices_fills_price_cache(app, test_cache):
+    """One grouped-daily call fills the price cache for every watchlisted symbol."""
+    from app.models import User, Watchlist
+    from app.services.stock_services import refresh_tracked_prices, get_stock_price
+    from app.utils.cache_manager import CacheEntry, StockCache
+
+    with app.app_context():
+        user = User(username="bulk", email="bulk@example.com")
+        db.session.add(user)
+        db.session.flush()
+        watchlist = Watchlist(name="Bulk", user_id=user.id)
+        watchlist.stocks.extend([Stock(symbol="AAPL", name="Apple"), Stock(symbol="MSFT", name="Microsoft")])
+        db.session.add(watchlist)
+        db.session.commit()
+
+        with patch('app.services.stock_services.polygon_client') as mock_polygon:
+            mock_polygon.get_grouped_daily_aggs.return_value = [
+                Mock(ticker="AAPL", close=150.0),
+                Mock(ticker="MSFT", close=410.0),
+                Mock(ticker="IBM", close=180.0),
+            ]
+            prices = refresh_tracked_prices()
+
+            assert prices == {"AAPL": 150.0, "MSFT": 410.0}
+            assert mock_polygon.get_grouped_daily_aggs.call_count == 1
+            assert get_stock_price("MSFT") == 410.0
+            mock_polygon.get_daily_open_close_agg.assert_not_called()
+            # Stored like get_or_fetch does, so it is refreshed in the background once stale
+            assert isinstance(StockCache(test_cache).get_value("stock:MSFT:price"), CacheEntry)
+
+@pytest.mark.integration
+def test_quote_bundle_fetches_all_three_concurrently(app, test_cache):
+    """History, price and details are fetched in parallel and returned together."""
+    import threading
+    from app.services.quote_bundle import get_quote_bundle
+
+    with app.app_context():
+        with patch('app.services.stock_services.polygon_client') as mock_polygon:
+            barrier = threading.Barrier(3, timeout=5)
+
+            def meet(result):
+                def call(*args, **kwargs):
+                    barrier.wait()  # only passes if all three calls are in flight at once
+                    return result
+                return call
+
+            mock_agg = Mock(timestamp=int(datetime.now().timestamp() * 1000),
+                            open=149.0, high=151.0, low=148.0, close=150.0, volume=1000000)
+            mock_polygon.get_aggs.side_effect = meet([mock_agg])
+            mock_polygon.get_daily_open_close_agg.side_effect = meet(Mock(close=150.5))
+            mock_details = Mock()
+            mock_details.name = "Apple Inc."
+            mock_polygon.get_ticker_details.side_effect = meet(mock_details)
+
+            from_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+            to_date = datetime.now().strftime('%Y-%m-%d')
+            bundle = get_quote_bundle("AAPL", from_date, to_date)
+
+            assert bundle.price == 150.5
+            assert len(bundle.history) == 1
+            assert bundle.details["name"] == "Apple Inc."
+
+
+@pytest.mark.integration
+def test_company_details_are_persisted_and_refreshed_in_bulk(app, test_cache):
+    """Details survive a cache flush and stale rows are re-fetched by the refresher."""
+    from app.models import CompanyDetails
+    from app.services.stock_services import get_company_details, refresh_company_details
+
+    def ticker_details(name):
+        details = Mock(market_cap=1.0, branding={'icon_url': 'https://api.polygon.io/icon.png'})
+        details.name = name
+        return details
+
+    with app.app_context(), patch('app.services.stock_services.polygon_client') as mock_polygon:
+        mock_polygon.get_ticker_details.return_value = ticker_details("Apple Inc.")
+        assert get_company_details("AAPL")['name'] == "Apple Inc."
+
+        row = db.session.get(CompanyDetails, "AAPL")
+        assert row.name == "Apple Inc." and row.icon_url == 'https://api.polygon.io/icon.png'
+
+        test_cache.clear()
+        details = get_company_details("AAPL")
+        assert details['name'] == "Apple Inc." and 'apiKey=' in details['icon_url']
+        assert mock_polygon.get_ticker_details.call_count == 1
+
+        assert refresh_company_details() == {}
+        row.refreshed_at = datetime(2020, 1, 1)
+        db.session.commit()
+        mock_polygon.get_ticker_details.return_value = ticker_details("Apple")
+        assert refresh_company_details() == {"AAPL": True}
+        assert db.session.get(CompanyDetails, "AAPL").refreshed_at > datetime(2020, 1, 1)
+        assert get_company_details("AAPL")['name'] == "Apple"
+
+@pytest.mark.integration
+def test_historical_api_returns_null_for_missing_fields(app, client, test_cache):
+    """A bar Polygon sent without a volume is served as JSON null, not NaN."""
+    day = datetime.now() - timedelta(days=5)
+    agg = Mock(open=1.0, high=2.0, low=0.5, close=1.5, volume=None,
+               timestamp=int(day.replace(hour=12).timestamp() * 1000))
+
+    with app.app_context(), patch('app.services.stock_services.polygon_client') as mock_polygon:
+        mock_polygon.get_aggs.return_value = [agg]
+        response = client.get('/stock/api/AAPL/historical?days=30')
+
+    assert response.status_code == 200
+    assert b'NaN' not in response.data
+    [bar] = response.get_json()
+    assert bar['volume'] is None and bar['close'] == 1.5
+
+@pytest.mark.integration
+def test_details_refresh_commits_each_symbol_on_its_own(app, test_cache):
+    """A row the database rejects is skipped; the other symbols are still stored."""
+    from app.models import CompanyDetails
+    from app.services import stock_services
+
+    upsert = stock_services._upsert_company_details
+
+    def upsert_rejected_for_bad(symbol, details):
+        upsert(symbol, details)
+        if symbol == "BAD":
+            db.session.get(CompanyDetails, symbol).refreshed_at = None  # violates NOT NULL
+
+    with app.app_context(), patch('app.services.stock_services.polygon_client') as mock_polygon, \
+            patch('app.services.stock_services._upsert_company_details', side_effect=upsert_rejected_for_bad):
+        mock_polygon.get_ticker_details.return_value = Mock(market_cap=1.0, branding=None)
+        results = stock_services.refresh_company_details(["AAPL", "BAD", "MSFT"], concurrency=1)
+
+        assert results == {"AAPL": True, "BAD": False, "MSFT": True}
+        assert {row.symbol for row in CompanyDetails.query.all()} == {"AAPL", "MSFT"}
+
+@pytest.mark.integration
+def test_regular_session_bars_are_masked_and_formatted_lazily():
+    from app.utils.bars import EASTERN_TZ
+    from app.services.stock_services import _regular_session_bars
+
+    def minute_agg(day, hhmm):
+        agg = Mock()
+        stamp = datetime.strptime(f"{day} {hhmm}", "%Y-%m-%d %H:%M").replace(tzinfo=EASTERN_TZ)
+        agg.timestamp = int(stamp.timestamp() * 1000)
+        agg.open = agg.high = agg.low = agg.close = 10.0
+        agg.volume = 5
+        return agg
+
+    # Spans a DST change (Mar 8 EST, Mar 11 EDT) and a weekend.
+    aggs = [minute_agg(day, hhmm)
+            for day in ("2024-03-08", "2024-03-09", "2024-03-11")
+            for hhmm in ("08:00", "09:30", "12:00", "16:00", "16:01")]
+    bars = _regular_session_bars(aggs, "2024-03-08", "2024-03-11", interval="1-minute")
+
+    records = bars.to_records()
+    assert [(r['date'], r['time']) for r in records] == [
+        ("2024-03-08", "09:30"), ("2024-03-08", "12:00"), ("2024-03-08", "16:00"),
+        ("2024-03-11", "09:30"), ("2024-03-11", "12:00"), ("2024-03-11", "16:00"),
+    ]
+    assert records[0]['datetime'] == "2024-03-08T09:30:00-05:00"
+    assert records[3]['datetime'] == "2024-03-11T09:30:00-04:00"
+    assert records[0]['interval'] == "1-minute"
+
+@pytest.mark.integration
+@patch('app.services.stock_services.polygon_client')
+def test_intraday_fetches_last_session_once_before_the_open(mock_polygon, app, test_cache):
+    from app.utils.bars import EASTERN_TZ
+    from app.services.stock_services import get_intraday_stock_data
+
+    def minute_agg(hhmm):
+        agg = Mock()
+        stamp = datetime.strptime(f"2024-03-08 {hhmm}", "%Y-%m-%d %H:%M").replace(tzinfo=EASTERN_TZ)
+        agg.timestamp = int(stamp.timestamp() * 1000)
+        agg.open, agg.high, agg.low, agg.close = 10.0, 11.0, 9.0, 10.5
+        agg.volume = 5
+        return agg
+
+    mock_polygon.get_aggs.return_value = [minute_agg(t) for t in ("09:30", "09:31", "09:35")]
+    monday_pre_open = datetime(2024, 3, 11, 8, 0, tzinfo=EASTERN_TZ)
+    with app.app_context(), patch('app.services.stock_services.market_now', return_value=monday_pre_open):
+        bars = get_intraday_stock_data("AAPL", minutes=5)
+
+    mock_polygon.get_aggs.assert_called_once()
+    call = mock_polygon.get_aggs.call_args[1]
+    assert (call['multiplier'], call['timespan'], call['from_']) == (1, "minute", "2024-03-08")
+    assert [(r['time'], r['volume']) for r in bars.to_records()] == [("09:30", 10.0), ("09:35", 5.0)]
+    assert bars.interval == "5-minute"
+
+@pytest.mark.integration
+@patch('app.services.stock_services.polygon_client')
+def test_intraday_refresh_fetches_only_bars_after_high_water_mark(mock_polygon, app):
+    from app.utils.bars import EASTERN_TZ
+    from app.services.stock_services import _fetch_intraday_data
+    from app.utils.bars import BarSeries
+
+    def minute(hhmm):
+        stamp = datetime.strptime(f"2024-03-08 {hhmm}", "%Y-%m-%d %H:%M").replace(tzinfo=EASTERN_TZ)
+        return int(stamp.timestamp() * 1000)
+
+    def minute_agg(hhmm, volume):
+        agg = Mock()
+        agg.timestamp = minute(hhmm)
+        agg.open, agg.high, agg.low, agg.close = 10.0, 11.0, 9.0, 10.5
+        agg.volume = volume
+        return agg
+
+    cached = BarSeries.from_aggs([minute_agg("09:30", 5), minute_agg("09:31", 2)], interval="1-minute")
+    mock_polygon.get_aggs.return_value = [minute_agg("09:31", 7), minute_agg("09:32", 3)]
+    mid_session = datetime(2024, 3, 8, 9, 33, tzinfo=EASTERN_TZ)
+    with app.app_context(), patch('app.services.stock_services.market_now', return_value=mid_session):
+        bars = _fetch_intraday_data("AAPL", cached)
+
+    mock_polygon.get_aggs.assert_called_once()
+    call = mock_polygon.get_aggs.call_args[1]
+    assert (call['from_'], call['to']) == (minute("09:31"), "2024-03-08")
+    assert [(r['time'], r['volume']) for r in bars.to_records()] == [("09:30", 5.0), ("09:31", 7.0), ("09:32", 3.0)]